@@ -1,7 +1,30 @@
-from recurrent.event_parser import RecurringEvent
+import threading
 
-def parse(s, now=None):
-    return RecurringEvent(now).parse(s)
+from recurrent.event_parser import RecurringEvent, ParseResult, TraceEvent, TIMED_OUT
+from recurrent.cache import LRUCache
 
-def format(r, now=None):
-    return RecurringEvent(now).format(r)
+# Warmed parsers for the convenience functions, per thread and settings; each call only rebinds the
+# reference date.  A parser holds its constants, so the least recently used are dropped to let go of
+# constants passed in for a single call; while an entry exists its constants' id can't be reused.
+MAX_PARSERS = 16
+_parsers = threading.local()
+
+def _get_parser(now, preferred_time_range, parse_constants):
+    try:
+        pool = _parsers.pool
+    except AttributeError:
+        pool = _parsers.pool = LRUCache(MAX_PARSERS)
+    key = (tuple(preferred_time_range), id(parse_constants))
+    r = pool.get(key)
+    if r is None:
+        r = RecurringEvent(now, preferred_time_range, parse_constants)
+        pool.put(key, r)
+    else:
+        r.set_now_date(now)
+    return r
+
+def parse(s, now=None, *, preferred_time_range=(8, 19), parse_constants=None, timeout=None):
+    return _get_parser(now, preferred_time_range, parse_constants).parse(s, timeout)
+
+def format(r, now=None, *, preferred_time_range=(8, 19), parse_constants=None, timeout=None):
+    return _get_parser(now, preferred_time_range, parse_constants).format(r, timeout)
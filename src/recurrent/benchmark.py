@@ -0,0 +1,409 @@
+"""Micro-benchmarks for the parser's hot paths.
+
+Run with ``python -m recurrent.benchmark [name ...]``; with no names every benchmark runs.
+"""
+import sys
+import timeit
+import datetime
+import warnings
+
+from recurrent.event_parser import RecurringEvent
+from recurrent.cache import MISSING
+
+NOW = datetime.datetime(2010, 1, 1)
+
+BENCHMARKS = {}
+
+def benchmark(func):
+    BENCHMARKS[func.__name__[len('bench_'):]] = func
+    return func
+
+def per_call_us(func, number):
+    """Best-of-three wall time of `func` in microseconds per call"""
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+def report(title, rows):
+    print(title)
+    for name, us in rows:
+        print('  %-60s %10.2f us/call' % (name, us))
+
+@benchmark
+def bench_constructor(number=2000):
+    """RecurringEvent construction and the module-level parse, with a fresh parsedatetime.Calendar
+    per parser (the old behaviour) vs. the shared Calendar/Constants registry"""
+    import recurrent
+    from recurrent.event_parser import import_parsedatetime
+    parsedatetime = import_parsedatetime()
+    def old_construct():
+        parsedatetime.Calendar()
+        RecurringEvent(NOW)
+    def old_parse():
+        parsedatetime.Calendar()
+        recurrent.parse('daily', NOW)
+    report('RecurringEvent construction', [
+        ('fresh Calendar per parser', per_call_us(old_construct, number)),
+        ('shared registry', per_call_us(lambda: RecurringEvent(NOW), number)),
+        ])
+    report("recurrent.parse('daily')", [
+        ('fresh Calendar per parser', per_call_us(old_parse, number)),
+        ('shared registry', per_call_us(lambda: recurrent.parse('daily', NOW), number)),
+        ])
+
+@benchmark
+def bench_module_functions(number=2000):
+    """recurrent.parse/format with a throwaway RecurringEvent per call (the old behaviour) vs. the
+    thread-local parser pool"""
+    import recurrent
+    rfc = recurrent.parse('every other friday', NOW)
+    report("recurrent.parse('every other friday')", [
+        ('new RecurringEvent per call', per_call_us(lambda: RecurringEvent(NOW).parse('every other friday'), number)),
+        ('pooled parser', per_call_us(lambda: recurrent.parse('every other friday', NOW), number)),
+        ('parse work alone', per_call_us(lambda: _parser.parse('every other friday'), number)),
+        ])
+    report('recurrent.format(%r)' % rfc, [
+        ('new RecurringEvent per call', per_call_us(lambda: RecurringEvent(NOW).format(rfc), number)),
+        ('pooled parser', per_call_us(lambda: recurrent.format(rfc, NOW), number)),
+        ('format work alone', per_call_us(lambda: _parser.format(rfc), number)),
+        ])
+
+@benchmark
+def bench_classifier(number=200):
+    """Token classification over the words of the test expressions: trying each of Tokenizer.TYPES
+    in turn vs. the single combined classifier, with and without the word cache"""
+    from recurrent.event_parser import Tokenizer
+    from recurrent.test import classifier_corpus
+    words = list(classifier_corpus())
+    def cascade():
+        for word in words:
+            for type_, regex in Tokenizer.TYPES:
+                if regex.match(word):
+                    break
+    def combined():
+        for word in words:
+            Tokenizer.RE_CLASSIFIER.match(word)
+    def cached():
+        for word in words:
+            Tokenizer.classify(word)
+    report('classify %d words' % len(words), [
+        ('regex cascade', per_call_us(cascade, number)),
+        ('combined classifier', per_call_us(combined, number)),
+        ('combined classifier + word cache', per_call_us(cached, number)),
+        ])
+
+@benchmark
+def bench_normalize(number=200):
+    """normalize() on a short phrase and a ~4KB email body: the old sequence of regex passes vs. the
+    single pass"""
+    from recurrent.event_parser import normalize
+    from recurrent.test import normalize_reference
+    phrase = 'Every Tuesday, Thursday and Friday at 3:15pm, except on Dec 25, 2020!'
+    body = ('Hi all,\n\nPlease schedule the planning meeting for every other Tuesday at noon, starting '
+            'Monday, January 4, 2021 (room 2-B).  Thanks -- see you there!\n\n') * 20
+    report('normalize(%d chars)' % len(phrase), [
+        ('regex passes', per_call_us(lambda: normalize_reference(phrase), number * 10)),
+        ('translate table + one regex', per_call_us(lambda: normalize(phrase), number * 10)),
+        ])
+    report('normalize(%d chars)' % len(body), [
+        ('regex passes', per_call_us(lambda: normalize_reference(body), number)),
+        ('translate table + one regex', per_call_us(lambda: normalize(body), number)),
+        ])
+
+@benchmark
+def bench_segment(number=20):
+    """Splitting the normalized test expressions into clauses: the cascade of regex searches vs. the
+    single pass over the words"""
+    from recurrent.event_parser import normalize, handle_begin_end, segment
+    from recurrent.test import expressions, segment_reference
+    phrases = [handle_begin_end(normalize(expr[0])) for expr in expressions]
+    long_phrase = ' '.join(phrases[:40])
+    report('segment %d phrases' % len(phrases), [
+        ('regex cascade', per_call_us(lambda: [segment_reference(s) for s in phrases], number)),
+        ('single pass', per_call_us(lambda: [segment(s) for s in phrases], number)),
+        ])
+    report('segment one %d-char phrase' % len(long_phrase), [
+        ('regex cascade', per_call_us(lambda: segment_reference(long_phrase), number * 10)),
+        ('single pass', per_call_us(lambda: segment(long_phrase), number * 10)),
+        ])
+
+def count_tokenizations(func):
+    """How many texts `func` tokenizes"""
+    from recurrent.event_parser import TokenStream
+    count = [0]
+    init = TokenStream.__init__
+    def counting_init(self, text):
+        count[0] += 1
+        init(self, text)
+    TokenStream.__init__ = counting_init
+    try:
+        func()
+    finally:
+        TokenStream.__init__ = init
+    return count[0]
+
+@benchmark
+def bench_tokenizations(number=500):
+    """Tokenizer constructions and time per parse, for phrases with start, end, count and except clauses"""
+    rows = []
+    for s in ('every day starting next tuesday until feb', 'every 3 fridays from november until february',
+            'daily except on June 23rd and July 4th', 'fridays starting in may for 10 occurrences',
+            'every Mon-Wed for the next 2 months', '1st fri in feb 2011 at 2pm'):
+        n = count_tokenizations(lambda: _parser.parse(s))
+        rows.append(('%s (%d tokenization%s)' % (s, n, '' if n == 1 else 's'), per_call_us(lambda: _parser.parse(s), number)))
+    report('tokenizations per parse', rows)
+
+@benchmark
+def bench_date_cache(number=500):
+    """Parses whose start and end fragments recur, with the parse_date cache disabled vs. enabled"""
+    cache = RecurringEvent.date_cache
+    maxsize = cache.maxsize
+    rows = []
+    for s in ('daily starting tomorrow until next month', 'every friday from jan 1 until dec 25th',
+            '1st fri in feb starting next month'):
+        try:
+            cache.resize(0)
+            rows.append(('%s (uncached)' % s, per_call_us(lambda: _parser.parse(s), number)))
+        finally:
+            cache.resize(maxsize)
+        rows.append(('%s (cached)' % s, per_call_us(lambda: _parser.parse(s), number)))
+    report('parse_date cache', rows)
+
+@benchmark
+def bench_result_cache(number=5):
+    """recurrent.parse over the test expressions with the whole-parse cache off vs. on (all hits)"""
+    import recurrent
+    from recurrent.test import expressions
+    phrases = [expr[0] for expr in expressions]
+    cache = RecurringEvent.result_cache
+    maxsize = cache.maxsize
+    def parse_all():
+        for s in phrases:
+            recurrent.parse(s, NOW)
+    rows = [('cache off', per_call_us(parse_all, number))]
+    try:
+        cache.resize(4096)
+        parse_all()
+        rows.append(('cache on', per_call_us(parse_all, number)))
+    finally:
+        cache.resize(maxsize)
+    report('recurrent.parse of %d phrases' % len(phrases), rows)
+
+@benchmark
+def bench_compile(number=5):
+    """Evaluating the test expressions against a new reference date: parsing each one again vs.
+    binding its compiled Plan"""
+    from recurrent.test import expressions
+    phrases = [expr[0] for expr in expressions]
+    plans = [_parser.compile(s) for s in phrases]
+    report('%d phrases at a new reference date' % len(phrases), [
+        ('parse', per_call_us(lambda: [RecurringEvent(NOW).parse(s) for s in phrases], number)),
+        ('compile once, bind', per_call_us(lambda: [plan.bind(NOW) for plan in plans], number)),
+        ])
+
+@benchmark
+def bench_templates(number=5):
+    """How the test expressions fare in the template cache (a phrase is served from its template,
+    compiled as the first of its template, compiled because its template depends on its slot values,
+    or compiled because it has no slots), and compile time with the cache off vs. on"""
+    from recurrent.event_parser import normalize, template_of
+    from recurrent.test import expressions
+    phrases = [expr[0] for expr in expressions]
+    cache = RecurringEvent.template_cache
+    maxsize = cache.maxsize
+    try:
+        cache.resize(4096)
+        cache.clear()
+        served = first = unserved = no_slots = 0
+        for s in phrases:
+            template = template_of(normalize(s))
+            if template is None:
+                no_slots += 1
+            else:
+                entry = cache.peek((template[0], RecurringEvent, (8, 19), None), MISSING)
+                if entry is MISSING:
+                    first += 1
+                elif entry is None:
+                    unserved += 1
+                else:
+                    served += 1
+            _parser.compile(s)
+        entries = [cache.peek(key) for key in list(cache._data)]
+        print('template cache on %d test expressions:' % len(phrases))
+        print('  %d served from a template (%.0f%%), %d the first of their template, %d with a template '
+                'that depends on its values, %d without slots' % (served, served * 100.0 / len(phrases), first,
+                unserved, no_slots))
+        print('  %d templates, %d of them depending on their values' % (len(entries), entries.count(None)))
+        def compile_all():
+            for s in phrases:
+                _parser.compile(s)
+        on = per_call_us(compile_all, number)
+        # Distinct phrases that share templates, as in traffic that only varies the numbers and names
+        shapes = ['every %d days', 'every %d weeks until jan %d', '%s and %s mon of each month',
+                'every %s in %s']
+        import itertools
+        variants = [shapes[0] % n for n in range(3, 10)] + \
+                [shapes[1] % (n, d) for n, d in itertools.product(range(3, 10), range(10, 29))] + \
+                [shapes[2] % (a, b) for a, b in itertools.permutations(('1st', '3rd', '4th', '5th'), 2)] + \
+                [shapes[3] % (d, m) for d, m in itertools.product(('monday', 'tuesday', 'friday'),
+                    ('january', 'march', 'june', 'august'))]
+        def compile_variants():
+            for s in variants:
+                _parser.compile(s)
+        variants_on = per_call_us(compile_variants, number)
+    finally:
+        cache.resize(maxsize)
+    try:
+        cache.resize(0)
+        report('compile %d test expressions' % len(phrases), [
+            ('no template cache', per_call_us(compile_all, number)),
+            ('template cache', on),
+            ])
+        report('compile %d phrases of %d shapes' % (len(variants), len(shapes)), [
+            ('no template cache', per_call_us(compile_variants, number)),
+            ('template cache', variants_on),
+            ])
+    finally:
+        cache.resize(maxsize)
+
+@benchmark
+def bench_canonical(number=2000):
+    """parse() of canonical phrases through the precomputed table vs. the full parse"""
+    from recurrent.event_parser import ParseResult, canonical_results
+    canonical_results()
+    def full_parse(s):
+        worker = _parser._worker()
+        result = ParseResult.from_event(worker, worker._parse(s))
+        result.restore(_parser)
+        return result.value
+    rows = []
+    for s in ('daily', 'weekdays', 'every monday', 'every other week', 'Weekends at 10am', 'fridays at 3:15pm'):
+        rows.append(('%s (full parse)' % s, per_call_us(lambda: full_parse(s), number)))
+        rows.append(('%s (table)' % s, per_call_us(lambda: _parser.parse(s), number)))
+    report('canonical phrases', rows)
+
+@benchmark
+def bench_prefilter(number=200):
+    """parse() of chat messages with no dates in them, with the prefilter off vs. on"""
+    messages = ('ok thanks, sounds good', 'I will send the report over when it is done',
+            'Can you take a look at the failing build? The logs are in the usual place.',
+            ('Hi all, please find attached the notes from the planning meeting.  Let me know if I missed '
+            'anything or got something wrong -- happy to fix it up. ') * 6)
+    rows = []
+    for s in messages:
+        name = s if len(s) < 40 else '%s... (%d chars)' % (s[:25], len(s))
+        try:
+            _parser.prefilter = False
+            rows.append(('%s (full parse)' % name, per_call_us(lambda: _parser.parse(s), number)))
+        finally:
+            del _parser.prefilter
+        rows.append(('%s (prefilter)' % name, per_call_us(lambda: _parser.parse(s), number)))
+    report('messages without dates', rows)
+
+STRESS_LENGTH = 1000
+STRESS_UNITS = ('mon ', '1st ', '2nd and ', 'mon-', 'tomorrow ', '9am ', 'in 5 minutes ', 'next last ', 'last 3 ',
+        'except on june 1 and ', 'every 2nd day ', 'from monday to friday ', '12 mon ', 'at the end ', '1:ago ')
+
+@benchmark
+def bench_stress(number=1):
+    """Worst-case inputs: parse time of each repeated unit as it grows to STRESS_LENGTH (time per
+    character should stay flat), then random mixes of the units up to that length"""
+    import random
+    rows = []
+    limit = STRESS_LENGTH
+    for unit in STRESS_UNITS:
+        times = []
+        for length in (limit // 8, limit // 4, limit // 2, limit):
+            s = (unit * length)[:length]
+            times.append(per_call_us(lambda: RecurringEvent(NOW).parse(s), number) / length)
+        rows.append(('%r x %d..%d chars (us/char: %s)' % (unit, limit // 8, limit,
+            ' '.join('%.1f' % t for t in times)), max(times) * limit))
+    report('repeated units, time at %d chars' % limit, rows)
+    rnd = random.Random(21)
+    times = []
+    for i in range(300):
+        chosen = [rnd.choice(STRESS_UNITS) for j in range(rnd.choice((1, 2, 3, 5)))]
+        s = ''
+        while len(s) < limit:
+            s += rnd.choice(chosen)
+        s = s[:limit]
+        times.append(per_call_us(lambda: RecurringEvent(NOW).parse(s), number))
+    times.sort()
+    report('%d random mixes of %d chars' % (len(times), limit), [
+        ('median', times[len(times) // 2]),
+        ('99th percentile', times[len(times) * 99 // 100]),
+        ('worst', times[-1]),
+        ])
+
+@benchmark
+def bench_trace(number=500):
+    """parse() and format() with no trace hook vs. one that collects the TraceEvents"""
+    phrases = ('every other friday except on jun 4', 'mar 4th at 9am', 'daily from jan 1 2010 to dec 25th 2020')
+    rules = [_parser.parse(s) for s in phrases]
+    def run():
+        for s in phrases:
+            _parser.parse(s)
+        for r in rules:
+            _parser.format(r)
+    events = []
+    rows = [('no trace', per_call_us(run, number))]
+    try:
+        _parser.trace = events.append
+        rows.append(('collecting trace events', per_call_us(run, number)))
+    finally:
+        del _parser.trace
+    report('%d phrases parsed and formatted' % len(phrases), rows)
+
+@benchmark
+def bench_stages(number=200):
+    """Where parse() and format() spend their time, from RecurringEvent.stage_times, and what timing costs"""
+    phrases = ('every other friday except on jun 4', 'mar 4th at 9am', 'daily from jan 1 2010 to dec 25th 2020',
+            '3rd thursday in april', 'tuesdays for the next six weeks', 'in 15 mins')
+    rules = [_parser.parse(s) for s in phrases]
+    def run():
+        for s in phrases:
+            _parser.parse(s)
+        for r in rules:
+            _parser.format(r)
+    timer = RecurringEvent.stage_times
+    rows = [('timing off', per_call_us(run, number))]
+    timer.clear()
+    with timer:
+        rows.append(('timing on', per_call_us(run, number)))
+    report('%d phrases parsed and formatted' % len(phrases), rows)
+    info = timer.info()
+    timer.clear()
+    report('per stage, per run', sorted(
+        (('%s (%.1f calls)' % (name, stage['calls'] / (3.0 * number)), stage['seconds'] / (3 * number) * 1e6)
+        for name, stage in info.items()), key=lambda row: -row[1]))
+
+@benchmark
+def bench_import(number=5):
+    """Cold start: a fresh interpreter importing recurrent, and then making its first parse and format, plus
+    the self time -X importtime reports for recurrent's own modules"""
+    import subprocess
+    def run(code):
+        subprocess.run([sys.executable, '-W', 'ignore', '-c', code], check=True)
+    report('fresh interpreter', [
+        ('python -c pass', per_call_us(lambda: run('pass'), number)),
+        ('import recurrent', per_call_us(lambda: run('import recurrent'), number)),
+        ('first parse', per_call_us(lambda: run("import recurrent; recurrent.parse('next tuesday')"), number)),
+        ('first parse and format', per_call_us(
+            lambda: run("import recurrent; recurrent.format(recurrent.parse('every other friday except in may'))"),
+            number)),
+        ])
+    def importtime():
+        # -X importtime's self time of recurrent's own modules, without the interpreter start-up
+        out = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import recurrent'],
+                capture_output=True, text=True, check=True).stderr
+        rows = [line[len('import time:'):].split('|') for line in out.splitlines() if line.startswith('import time:')]
+        return sum(int(us) for us, cumulative, name in rows[1:] if name.strip().split('.')[0] == 'recurrent')
+    report('-X importtime', [('recurrent modules, self time', min(importtime() for _ in range(number)))])
+
+_parser = RecurringEvent(NOW)
+
+def main(names):
+    warnings.simplefilter('ignore')     # parsedatetime's deprecation warnings
+    for name in names or BENCHMARKS:
+        BENCHMARKS[name]()
+
+if __name__ == '__main__':  # pragma nocover
+    main(sys.argv[1:])
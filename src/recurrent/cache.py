@@ -0,0 +1,66 @@
+import threading
+from collections import OrderedDict
+
+MISSING = object()
+
+class LRUCache(object):
+    """A thread-safe, size-bounded least-recently-used cache that counts its hits and misses.
+    A maxsize of 0 disables caching."""
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key, default=None):
+        """The value for `key` without counting a hit or miss or refreshing its recency"""
+        with self._lock:
+            return self._data.get(key, default)
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def resize(self, maxsize):
+        """Change the bound, evicting the least recently used entries if needed"""
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        """Drop every entry and reset the statistics"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def reset_stats(self):
+        """Reset the hit and miss counts, keeping the entries"""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return dict(hits=self.hits, misses=self.misses, size=len(self._data), maxsize=self.maxsize)
+
+    def _evict(self):
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
@@ -1,5 +1,32 @@
 import re
 
+class LazyPattern(object):
+    """A regex compiled on first use, so importing recurrent doesn't compile every pattern up front.
+    `pattern` is there without compiling; the first use of any other attribute compiles and copies
+    it onto the instance, so later uses cost no more than on a compiled pattern.  The re module's
+    functions only take compiled patterns, so call the methods instead: RE_X.sub(...), not re.sub(RE_X, ...)."""
+    def __init__(self, pattern, flags=0):
+        self.pattern = pattern
+        self.flags = flags
+
+    def __getattr__(self, name):
+        if name.startswith('__'):       # copy and pickle probe for these; they aren't forwarded
+            raise AttributeError(name)
+        value = getattr(re.compile(self.pattern, self.flags), name)
+        setattr(self, name, value)
+        return value
+
+    def __repr__(self):
+        # What the compiled pattern's repr would be, which cuts the pattern's repr at 200 characters
+        text = repr(self.pattern)[:200]
+        flags = sorted((f for f in re.RegexFlag if f & self.flags and f != re.UNICODE), key=lambda f: f.value)
+        if flags:
+            return 're.compile(%s, %s)' % (text, '|'.join('re.' + f.name for f in flags))
+        return 're.compile(%s)' % text
+
+def lazy_compile(pattern, flags=0):
+    return LazyPattern(pattern, flags)
+
 DoWs = (
     r'mon(day)?',
     r'tues?(day)?',
@@ -11,11 +38,11 @@ DoWs = (
     r'weekday',
     r'weekend'
 )
-RE_DOWS = [re.compile(r) for r in DoWs]
-RE_PLURAL_DOW = re.compile('|'.join( ['mondays', 'tuesdays', 'wednesdays',
+RE_DOWS = [lazy_compile(r) for r in DoWs]
+RE_PLURAL_DOW = lazy_compile('|'.join( ['mondays', 'tuesdays', 'wednesdays',
     'thursdays', 'fridays', 'saturdays', 'sundays']))
-RE_DOW = re.compile('(' + ')|('.join(DoWs) + ')')
-RE_PLURAL_WEEKDAY = re.compile('weekdays|weekends|%s'%RE_PLURAL_DOW.pattern)
+RE_DOW = lazy_compile('(' + ')|('.join(DoWs) + ')')
+RE_PLURAL_WEEKDAY = lazy_compile('weekdays|weekends|%s'%RE_PLURAL_DOW.pattern)
 weekday_codes = [ 'MO','TU','WE','TH','FR', 'SA', 'SU', 'MO,TU,WE,TH,FR',
 'SA,SU']
 ordered_weekday_codes = ('', 'SU', 'MO', 'TU', 'WE', 'TH', 'FR', 'SA')
@@ -37,13 +64,13 @@ MoYs = (
     r'nov(ember)?',
     r'dec(ember)?',
 )
-RE_MOYS = [re.compile(r + '$') for r in MoYs]
-RE_MOY = re.compile('(' + ')$|('.join(MoYs) + ')$')
-RE_MOY_NOT_ANCHORED = re.compile('(' + ')|('.join(MoYs) + ')')
+RE_MOYS = [lazy_compile(r + '$') for r in MoYs]
+RE_MOY = lazy_compile('(' + ')$|('.join(MoYs) + ')$')
+RE_MOY_NOT_ANCHORED = lazy_compile('(' + ')|('.join(MoYs) + ')')
 
 units = ['day', 'week', 'month', 'year', 'hour', 'minute', 'min', 'sec', 'seconds'] # Issue #3
 units_freq = ['daily', 'weekly', 'monthly', 'yearly', 'hourly', 'minutely', 'minutely', 'secondly', 'secondly'] # Issue #3
-RE_UNITS = re.compile(r'^(' + 's?|'.join(units) + '?)$')
+RE_UNITS = lazy_compile(r'^(' + 's?|'.join(units) + '?)$')
 
 ordinals = (
     r'first',
@@ -58,9 +85,9 @@ ordinals = (
     r'tenth',
     r'last',        # Issue #18
     )
-RE_ORDINALS = [re.compile(r + '$') for r in ordinals]
-RE_ORDINAL = re.compile(r'\d+(st|nd|rd|th)$|' + '$|'.join(ordinals))
-RE_ORDINAL_NOT_ANCHORED = re.compile(r'\d+(st|nd|rd|th)|' + '|'.join(ordinals))
+RE_ORDINALS = [lazy_compile(r + '$') for r in ordinals]
+RE_ORDINAL = lazy_compile(r'\d+(st|nd|rd|th)$|' + '$|'.join(ordinals))
+RE_ORDINAL_NOT_ANCHORED = lazy_compile(r'\d+(st|nd|rd|th)|' + '|'.join(ordinals))
 numbers = (
     r'zero',
     r'one',
@@ -74,16 +101,16 @@ numbers = (
     r'nine',
     r'ten',
     )
-RE_NUMBERS = [re.compile(r + '$') for r in numbers]
-RE_NUMBER = re.compile('(' + '|'.join(numbers) + r')$|(\d+)$')
-RE_NUMBER_NOT_ANCHORED = re.compile('(' + '|'.join(numbers) + r')|(\d+)')
+RE_NUMBERS = [lazy_compile(r + '$') for r in numbers]
+RE_NUMBER = lazy_compile('(' + '|'.join(numbers) + r')$|(\d+)$')
+RE_NUMBER_NOT_ANCHORED = lazy_compile('(' + '|'.join(numbers) + r')|(\d+)')
 
-RE_EVERY = re.compile(r'(every|each|once)$')
+RE_EVERY = lazy_compile(r'(every|each|once)$')
 
-RE_THROUGH = re.compile(r'(through|thru)$')
+RE_THROUGH = lazy_compile(r'(through|thru)$')
 
-RE_DAILY = re.compile(r'daily|everyday')
-RE_RECURRING_UNIT = re.compile(r'weekly|monthly|yearly')
+RE_DAILY = lazy_compile(r'daily|everyday')
+RE_RECURRING_UNIT = lazy_compile(r'weekly|monthly|yearly')
 
 # getters
 def get_number(s):
@@ -98,8 +125,9 @@ def get_ordinal_index(s):
     except ValueError:
         pass
     sign = -1 if s[0] == '-' else 1     # Issue #18
+    word = s[1:] if sign < 0 else s
     for i, reg in enumerate(RE_ORDINALS):
-        if reg.match(s):
+        if reg.match(word):
             if i == 10:         # Issue #18
                 return -1       # Issue #18
             return sign * (i + 1)   # Issue #18
@@ -2,15 +2,16 @@ import re
 import datetime
 import logging
 import sys
+import time
 import calendar
+import threading
+import weakref
+from array import array
+from bisect import bisect_right
 #import traceback
 
-try:
-    from parsedatetime import parsedatetime
-except ImportError:     # pragma nocover
-    import parsedatetime
-
 from recurrent.constants import *
+from recurrent.cache import LRUCache, MISSING
 
 DEBUG=False
 
@@ -22,13 +23,13 @@ else:
     log.addHandler(logging.NullHandler())   # Issue #4
 
 # Issue #14 RE_TIME = re.compile(r'(?P<hour>\d{1,2}):?(?P<minute>\d{2})?\s?(?P<mod>am|pm)?(oclock)?')
-RE_TIME = re.compile(r'(?P<hour>\d{1,2}):?(?P<minute>\d{2})?\s?(?P<mod>am?|pm?)?(o\'?clock)?')
-RE_DEF_TIME = re.compile(r'[:apo]')             # Issue #13: Time with a ':', 'am', 'pm', or 'oclock'
-RE_AT_TIME = re.compile(r'at\s%s' % RE_TIME.pattern)
-RE_AT_TIME_END = re.compile(r'at\s%s$' % RE_TIME.pattern)
-RE_STARTING = re.compile(r'start(?:s|ing)?')
-RE_ENDING = re.compile(r'(?:\bend|until)(?:s|ing)?')
-RE_REPEAT = re.compile(r'(?:every|each|\bon\b|repeat(s|ing)?)')
+RE_TIME = lazy_compile(r'(?P<hour>\d{1,2}):?(?P<minute>\d{2})?\s?(?P<mod>am?|pm?)?(o\'?clock)?')
+RE_DEF_TIME = lazy_compile(r'[:apo]')             # Issue #13: Time with a ':', 'am', 'pm', or 'oclock'
+RE_AT_TIME = lazy_compile(r'at\s%s' % RE_TIME.pattern)
+RE_AT_TIME_END = lazy_compile(r'at\s%s$' % RE_TIME.pattern)
+RE_STARTING = lazy_compile(r'start(?:s|ing)?')
+RE_ENDING = lazy_compile(r'(?:\bend|until)(?:s|ing)?')
+RE_REPEAT = lazy_compile(r'(?:every|each|\bon\b|repeat(s|ing)?)')
 RE_START = r'(%s)\s(?P<starting>.*)' % RE_STARTING.pattern
 RE_START_SHORT = r'(%s)\s(?P<starting>.*?)' % RE_STARTING.pattern
 RE_EVENT = r'(?P<event>(?:every|each|\bon\b|\bthe\b|repeat|%s|%s|%s)(?:s|ing)?(.*))'%(
@@ -36,58 +37,425 @@ RE_EVENT = r'(?P<event>(?:every|each|\bon\b|\bthe\b|repeat|%s|%s|%s)(?:s|ing)?(.
 RE_EVENT_NO_ORD = r'(?P<event>(?:every|each|\bon\b|\bthe\b|repeat|%s|%s)(?:s|ing)?(.*))'%(
         RE_DAILY.pattern, RE_PLURAL_WEEKDAY.pattern)
 RE_END = r'%s(?P<ending>.*)' % RE_ENDING.pattern
-RE_START_EVENT = re.compile(r'%s\s%s' % (RE_START_SHORT, RE_EVENT_NO_ORD))
-RE_EVENT_START = re.compile(r'%s\s%s' % (RE_EVENT, RE_START))
-RE_FROM_TO = re.compile(r'(?P<event>.*)from(?P<starting>.*)(to|through|thru|until)(?P<ending>.*)')
-RE_COUNT = re.compile(r'(?P<event>.*?)(?:\bfor\s+|\b(?:for\s+)?up\s+to\s+)?(?:(?P<twice>twice)|(?P<count>%s)(?:x|\s*times|\s*occurrences))'%RE_NUMBER_NOT_ANCHORED.pattern)
-RE_COUNT_UNTIL1 = re.compile(r'(?P<event>.*?)(?:\bfor\s+the\s+next\s+|\bfor\s+(?:up\s+to\s+)?)\s*(?P<unit>week|month|year)')
-RE_COUNT_UNTIL = re.compile(r'(?P<event>.*?)(?:\bfor\s+the\s+next\s+|\bfor\s+(?:up\s+to\s+)?)(?P<count>%s)\s*(?P<unit>weeks|months|years)'%RE_NUMBER_NOT_ANCHORED.pattern)
-RE_START_END = re.compile(r'%s\s%s' % (RE_START, RE_END))
-RE_OTHER_END = re.compile(r'(?P<other>.*)\s%s' % RE_END)
-RE_SEP = re.compile(r'(from|to|through|thru|on|at|of|in|a|an|the|and|or|both)$')
-RE_AMBIGMOD = re.compile(r'(this|next|last)$')
-RE_OTHER = re.compile(r'other|alternate')
-RE_AMPM = re.compile(r'am?|pm?|o\'?clock')     # Issue #13
-RE_LONG_DATE_START = re.compile(r'(%s),\s*(%s)' % (RE_DOW, RE_MOY_NOT_ANCHORED))
-RE_EXCEPT = re.compile(r'(?P<event>.*?)\bexcept(?:\s+for\s|\s+on\s+|\s+in\s+)?(?P<except>.*)$')
-RE_YEAR = re.compile(r'\b(\d\d\d\d)\b')
-RE_ORD_DAY_WEEK_MONTH_OR_YEAR = re.compile(r'(?P<ord>%s)\s+(?P<unit>(?:%s|day|week|month|year)\b)'%(RE_ORDINAL_NOT_ANCHORED.pattern, RE_DOW.pattern))
-RE_THRU = re.compile(r'(?P<first>%s|%s)(?:[-]|\s+thru\s+|\s+through\s+)(?P<second>%s|%s)'%(RE_PLURAL_DOW.pattern, RE_DOW.pattern, RE_PLURAL_DOW.pattern, RE_DOW.pattern))
-RE_BEGIN_END_OF = re.compile(r'(?P<be>beginning|begin|start|ending|end)\s+of\b')                      # Issue #12
-RE_AT_BEGIN_END = re.compile(r'\bat(\s+the)?\s+(?P<be>beginning\b|begin\b|start\b|ending\b|end\b)')     # Issue #12
-RE_RRULE = re.compile(r'^RRULE:(?P<rr>.*)$', re.M)
-RE_BYSETPOS = re.compile(r'\binstance\b|\boccurrence\b')
+RE_START_EVENT = lazy_compile(r'%s\s%s' % (RE_START_SHORT, RE_EVENT_NO_ORD))
+RE_EVENT_START = lazy_compile(r'%s\s%s' % (RE_EVENT, RE_START))
+RE_FROM_TO = lazy_compile(r'(?P<event>.*)from(?P<starting>.*)(to|through|thru|until)(?P<ending>.*)')
+RE_COUNT = lazy_compile(r'(?P<event>.*?)(?:\bfor\s+|\b(?:for\s+)?up\s+to\s+)?(?:(?P<twice>twice)|(?P<count>%s)(?:x|\s*times|\s*occurrences))'%RE_NUMBER_NOT_ANCHORED.pattern)
+RE_COUNT_UNTIL1 = lazy_compile(r'(?P<event>.*?)(?:\bfor\s+the\s+next\s+|\bfor\s+(?:up\s+to\s+)?)\s*(?P<unit>week|month|year)')
+RE_COUNT_UNTIL = lazy_compile(r'(?P<event>.*?)(?:\bfor\s+the\s+next\s+|\bfor\s+(?:up\s+to\s+)?)(?P<count>%s)\s*(?P<unit>weeks|months|years)'%RE_NUMBER_NOT_ANCHORED.pattern)
+RE_START_END = lazy_compile(r'%s\s%s' % (RE_START, RE_END))
+RE_OTHER_END = lazy_compile(r'(?P<other>.*)\s%s' % RE_END)
+RE_SEP = lazy_compile(r'(from|to|through|thru|on|at|of|in|a|an|the|and|or|both)$')
+RE_AMBIGMOD = lazy_compile(r'(this|next|last)$')
+RE_OTHER = lazy_compile(r'other|alternate')
+RE_AMPM = lazy_compile(r'am?|pm?|o\'?clock')     # Issue #13
+RE_LONG_DATE_START = lazy_compile(r'(%s),\s*(%s)' % (RE_DOW, RE_MOY_NOT_ANCHORED))
+RE_EXCEPT = lazy_compile(r'(?P<event>.*?)\bexcept(?:\s+for\s|\s+on\s+|\s+in\s+)?(?P<except>.*)$')
+RE_YEAR = lazy_compile(r'\b(\d\d\d\d)\b')
+RE_ORD_DAY_WEEK_MONTH_OR_YEAR = lazy_compile(r'(?P<ord>%s)\s+(?P<unit>(?:%s|day|week|month|year)\b)'%(RE_ORDINAL_NOT_ANCHORED.pattern, RE_DOW.pattern))
+RE_THRU = lazy_compile(r'(?P<first>%s|%s)(?:[-]|\s+thru\s+|\s+through\s+)(?P<second>%s|%s)'%(RE_PLURAL_DOW.pattern, RE_DOW.pattern, RE_PLURAL_DOW.pattern, RE_DOW.pattern))
+RE_BEGIN_END_OF = lazy_compile(r'(?P<be>beginning|begin|start|ending|end)\s+of\b')                      # Issue #12
+RE_AT_BEGIN_END = lazy_compile(r'\bat(\s+the)?\s+(?P<be>beginning\b|begin\b|start\b|ending\b|end\b)')     # Issue #12
+RE_RRULE = lazy_compile(r'^RRULE:(?P<rr>.*)$', re.M)
+RE_BYSETPOS = lazy_compile(r'\binstance\b|\boccurrence\b')
+# Used by format
+RE_SQUASHER = lazy_compile(r'((?:\d.. to the )?last|\d..)\s(Mon|Tue|Wed|Thu|Fri|Sat|Sun) and ((?:\d.. to the )?last|\d..)\s\2')
+RE_DTSTART_LINE = lazy_compile(r'^DTSTART.*?\n')
+SHORT_BYDAY_NAMES = {'every weekend': 'weekends', 'every weekday': 'weekdays'}
+
+# parsedatetime and dateutil take longer to import than all of recurrent, so they are imported the first
+# time a parser needs them rather than with the module.
+def import_parsedatetime():
+    try:
+        from parsedatetime import parsedatetime
+    except ImportError:     # pragma nocover
+        import parsedatetime
+    return parsedatetime
+
+def rrulestr(s, **kwargs):
+    """dateutil.rrule.rrulestr, imported on the first call, which replaces this function with it"""
+    global rrulestr
+    from dateutil.rrule import rrulestr
+    return rrulestr(s, **kwargs)
+
+# Building parsedatetime.Constants compiles all of the locale's regexes, which costs more than
+# most parses, so prepared Constants are shared process-wide, keyed by locale.  A Calendar keeps a
+# context stack while it parses and so isn't thread-safe; those are cheap to build on top of
+# prepared Constants and are shared per thread instead.
+_constants_registry = {}
+_constants_lock = threading.Lock()
+_calendar_registry = threading.local()
+
+def get_constants(localeID=None, usePyICU=True):
+    """Return the shared parsedatetime.Constants for `localeID`, building it on first use"""
+    key = (localeID, usePyICU)
+    consts = _constants_registry.get(key)
+    if consts is None:
+        with _constants_lock:
+            consts = _constants_registry.get(key)
+            if consts is None:
+                consts = import_parsedatetime().Constants(localeID=localeID, usePyICU=usePyICU)
+                _constants_registry[key] = consts
+    return consts
+
+# Calendars kept per thread.  A Calendar holds its constants, so a weak mapping from the constants
+# would never drop them; the least recently used are dropped instead, letting go of constants built
+# for one parser.  An entry keeps its constants alive, so their id can't be reused while it exists.
+MAX_CALENDARS = 16
+
+def get_calendar(parse_constants=None):
+    """Return this thread's parsedatetime.Calendar for `parse_constants` (default: the shared
+    default-locale constants)"""
+    if parse_constants is None:
+        parse_constants = get_constants()
+    try:
+        calendars = _calendar_registry.calendars
+    except AttributeError:
+        calendars = _calendar_registry.calendars = LRUCache(MAX_CALENDARS)
+    cal = calendars.get(id(parse_constants))
+    if cal is None:
+        cal = import_parsedatetime().Calendar(constants=parse_constants)
+        calendars.put(id(parse_constants), cal)
+    return cal
+
+# A parse or format given a timeout runs against a deadline, kept per thread so that it covers the
+# workers, nested formats and cached plans the call uses without being stored on any of them.  The
+# stages check it with check_deadline(), which raises DeadlineExceeded once it has passed; the call
+# then returns TIMED_OUT.
+_deadline = threading.local()
+
+class DeadlineExceeded(Exception):
+    """Raised by check_deadline() inside a call that has run out of time.  Code that catches
+    Exception around the stages must let it through."""
+
+class _TimedOut(object):
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return 'TIMED_OUT'
+
+TIMED_OUT = _TimedOut()     # What parse and format return when they run out of time; falsy, like None
+
+def check_deadline():
+    at = getattr(_deadline, 'at', None)
+    if at is not None and time.monotonic() > at:
+        raise DeadlineExceeded()
+
+def call_with_timeout(timeout, func, *args):
+    """func(*args), or TIMED_OUT if it runs past `timeout` seconds.  A deadline already in force on
+    this thread still applies."""
+    outer = getattr(_deadline, 'at', None)
+    at = time.monotonic() + timeout
+    if outer is not None and outer < at:
+        at = outer
+    _deadline.at = at
+    try:
+        return func(*args)
+    except DeadlineExceeded:
+        if at is outer:
+            raise
+        RecurringEvent.counters.add('timeouts')
+        return TIMED_OUT
+    finally:
+        _deadline.at = outer
+
+class StageTimer(object):
+    """Wall time and call counts of the parsing stages, summed across calls and threads.
+    `stages` maps each stage's name to the class or module and attribute of the function that runs it.
+    While enabled the functions are replaced with timing wrappers, so a disabled timer costs nothing;
+    use it as a context manager or call enable() and disable().  A stage's time includes the stages
+    it calls; a call made inside a call of the same stage (format formatting the start date) is part
+    of it and isn't counted again."""
+    def __init__(self, stages):
+        self.stages = stages
+        self._originals = {}
+        self._calls = {}
+        self._seconds = {}
+        self._lock = threading.Lock()
+        self._active = threading.local()
+
+    def enable(self):
+        with self._lock:
+            for name, (owner, attr) in self.stages.items():
+                if name not in self._originals:
+                    func = self._originals[name] = owner.__dict__[attr]
+                    setattr(owner, attr, self._timed(name, func))
+
+    def disable(self):
+        with self._lock:
+            for name, func in self._originals.items():
+                owner, attr = self.stages[name]
+                setattr(owner, attr, func)
+            self._originals.clear()
+
+    @property
+    def enabled(self):
+        return bool(self._originals)
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    def info(self):
+        """{stage: {'calls': n, 'seconds': total}} for each stage that has run"""
+        with self._lock:
+            return dict((name, dict(calls=calls, seconds=self._seconds[name]))
+                    for name, calls in self._calls.items())
+
+    def clear(self):
+        with self._lock:
+            self._calls.clear()
+            self._seconds.clear()
+
+    def _timed(self, name, func):
+        active = self._active
+        def timed(*args, **kwargs):
+            try:
+                stages = active.stages
+            except AttributeError:
+                stages = active.stages = set()
+            if name in stages:
+                return func(*args, **kwargs)
+            stages.add(name)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                stages.discard(name)
+                with self._lock:
+                    self._calls[name] = self._calls.get(name, 0) + 1
+                    self._seconds[name] = self._seconds.get(name, 0.0) + seconds
+        timed.__wrapped__ = func
+        return timed
+
+class Counters(object):
+    """Process-wide counts of how often parse and format take their shortcuts, their slow paths and
+    their fallbacks, with the hit rates of `caches` (a dict of LRUCaches by name).  Counters are
+    created on first add()."""
+    def __init__(self, caches=None):
+        self.caches = caches or {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, n=1):
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + n
+
+    def __getitem__(self, name):
+        return self._counts.get(name, 0)
+
+    def info(self):
+        """{'counts': {name: n}, 'caches': {name: {hits, misses, hit_rate, size, maxsize}}}"""
+        with self._lock:
+            counts = dict(self._counts)
+        caches = {}
+        for name, cache in self.caches.items():
+            info = caches[name] = cache.info()
+            lookups = info['hits'] + info['misses']
+            info['hit_rate'] = info['hits'] / lookups if lookups else None
+        return dict(counts=counts, caches=caches)
+
+    def clear(self):
+        """Zero the counts and the caches' hit and miss counts, keeping their entries"""
+        with self._lock:
+            self._counts.clear()
+        for cache in self.caches.values():
+            cache.reset_stats()
+
+# normalize() lowercases, removes commas before a year, in long format dates ("Tuesday, January...")
+# and before 'and', changes all other commas to ' and ', drops punctuation other than . / : and - (. is
+# allowed for international formatting), and collapses whitespace.  Whitespace is collapsed last, so a
+# removed comma can simply become a space: one substitution handles the commas, a translate table drops
+# ASCII punctuation, and one regex collapses whitespace.
+RE_COMMA = lazy_compile(r',(\s*(?:\d\d\d\d|and))?')
+RE_PUNCTUATION = lazy_compile(r'[^\w\s./:-]')
+PUNCTUATION_TABLE = dict((i, None) for i in range(128)        # What RE_PUNCTUATION matches in ASCII
+        if not (chr(i).isalnum() or chr(i) == '_' or chr(i).isspace() or chr(i) in './:-'))
+RE_UNCOLLAPSED_SPACE = lazy_compile(r'\s{2,}|[^\S ]')
+
+def _sub_comma(m):
+    if m.group(1) is None:
+        return ' and '
+    return ' ' + m.group(1)
 
 def normalize(s):
     s = s.strip().lower()
-    s = re.sub(r',\s*(\d\d\d\d)', r' \1', s) # Remove commas in dates before the year
-    s = re.sub(RE_LONG_DATE_START, r'\1 \2', s) # Remove commas in long format dates, e.g. "Tuesday, January..."
-    s = re.sub(r',\s*and', ' and', s)       # Remove commas before 'and'
-    s = re.sub(r',', ' and ', s)            # Change all other commas to ' and '
-    s = re.sub(r'[^\w\s\./:-]', '', s)      # Allow . for international formatting
-    s = re.sub(r'\s+', ' ', s)
-    return s
+    if ',' in s:
+        if RE_LONG_DATE_START.search(s):
+            # RE_LONG_DATE_START is built from the reprs of the compiled DoW and MoY patterns, so it only
+            # matches text containing those reprs; replay the original passes for such input.
+            s = re.sub(r',\s*(\d\d\d\d)', r' \1', s)
+            s = RE_LONG_DATE_START.sub(r'\1 \2', s)
+            s = re.sub(r',\s*and', ' and', s)
+        s = RE_COMMA.sub(_sub_comma, s)
+    if s.isascii():
+        s = s.translate(PUNCTUATION_TABLE)
+    else:
+        s = RE_PUNCTUATION.sub('', s)
+    return RE_UNCOLLAPSED_SPACE.sub(' ', s)
+
+class PhraseRewriter(object):
+    """Phrase-level rewrite rules, applied in a single left-to-right pass over the words of a phrase.
+
+    Rules are registered for a stage, and for the words or token types they can start at, so a word
+    that can't start any rule costs one lookup however many rules there are.  A rule is called as
+    rule(words, i, phrase) and returns None to pass, or (replacement words, number of words consumed,
+    whether the last replacement word should be scanned again)."""
+    def __init__(self):
+        self.stages = {}
+
+    def add_rule(self, stage, rule, words=(), types=()):
+        by_word, by_type = self.stages.setdefault(stage, ({}, {}))
+        for word in words:
+            by_word.setdefault(word, []).append(rule)
+        for type_ in types:
+            by_type.setdefault(type_, []).append(rule)
+
+    def rewrite(self, stage, s):
+        by_word, by_type = self.stages[stage]
+        words = s.split(' ')
+        changed = False
+        i = 0
+        while i < len(words):
+            rules = by_word.get(words[i]) or by_type.get(Tokenizer.classify(words[i]))
+            if rules:
+                for rule in rules:
+                    r = rule(words, i, s)
+                    if r is not None:
+                        replacement, consumed, rescan = r
+                        words[i:i + consumed] = replacement
+                        changed = True
+                        i += len(replacement) - 1 if rescan else len(replacement)
+                        break
+                else:
+                    i += 1
+            else:
+                i += 1
+        if changed:
+            return ' '.join(words)
+        return s
+
+PHRASE_REWRITER = PhraseRewriter()
+RE_OF = lazy_compile(r'of\b')
+RE_BEGIN_END = lazy_compile(r'(?:beginning|begin|start|ending|end)\b')
+RE_ORD_INTERVAL_UNIT = lazy_compile(r'(?:%s|day|week|month|year)\b' % RE_DOW.pattern)
+RE_DAY_NAME = lazy_compile(r'%s|%s' % (RE_PLURAL_DOW.pattern, RE_DOW.pattern))
+
+def _rule_begin_end_of(words, i, s):       # Issue #12: "end of" => "last of"
+    if i + 1 < len(words) and RE_OF.match(words[i + 1]):
+        return ['last' if words[i].startswith('e') else 'first'], 1, False
+    return None
+
+def _rule_at_begin_end(words, i, s):       # Issue #12: "at the end" => "on the last"
+    j = i + 1
+    if j < len(words) and words[j] == 'the':
+        j += 1
+    if j >= len(words):
+        return None
+    m = RE_BEGIN_END.match(words[j])
+    if not m:
+        return None
+    if m.end() == len(words[j]) and j + 1 < len(words) and RE_OF.match(words[j + 1]):
+        return None     # "at the end of ..." is handled as "end of"
+    be = 'last' if words[j].startswith('e') else 'first'
+    return ['on', 'the', be + words[j][m.end():]], j + 1 - i, False
+
+_ord_interval_phrase = (None, None)
+
+def _ord_interval_facts(s):
+    """What _rule_ord_interval needs to know about the whole phrase: whether it repeats, mentions
+    weeks, months or years, and names a month.  Remembered for the last phrase, since the rule is
+    called for each of its ordinals."""
+    global _ord_interval_phrase
+    phrase, facts = _ord_interval_phrase
+    if phrase is not s:
+        facts = (bool(RE_REPEAT.search(s)), 'week' in s or 'month' in s, 'year' in s,
+                bool(RE_MOY_NOT_ANCHORED.search(s)))
+        _ord_interval_phrase = (s, facts)
+    return facts
+
+def _rule_ord_interval(words, i, s):
+    """Replace every 2nd day => every 2 days; every 3rd month => every 3 months; every 4th year => every 4 years;
+    every 5th fri => every 5 fridays"""
+    if i + 1 >= len(words) or not RE_ORDINAL_NOT_ANCHORED.fullmatch(words[i]):
+        return None
+    repeats, week_or_month, year, moy = _ord_interval_facts(s)
+    if not repeats:
+        return None
+    m = RE_ORD_INTERVAL_UNIT.match(words[i + 1])
+    if not m:
+        return None
+    unit = m.group(0)
+    if unit == 'day' and (week_or_month or year):   # e.g. last day of each month; every year on the 31st day
+        return None                 # Don't change this kind!
+    if unit == 'day' or unit == 'week' or unit == 'month' or unit == 'year':
+        unit += 's'
+    elif moy or week_or_month:      # e.g. fourth thu of march, third fri of each month
+        return None                 # Don't change this kind!
+    else:
+        unit = ' and '.join([plural_day_names[u].lower() for u in get_DoW(unit)])
+    replacement = [str(get_ordinal_index(words[i]))] + unit.split(' ')
+    replacement[-1] += words[i + 1][m.end():]
+    return replacement, 2, True     # The unit could start a day range, e.g. every 2nd mon-fri
+
+def _thru_words(first, second, rest):
+    log.debug('thru(%s, %s)', first, second)
+    dn = plural_day_names if first.endswith('s') or second.endswith('s') else day_names
+    first = get_DoW(first)
+    second = get_DoW(second)
+    result = []
+    if first == second:     # Mon-Mon
+        result.extend(first)
+    else:
+        while True:
+            result.extend(first)
+            first = [next_day[first[-1]]]
+            if first[0] == second[0]:
+                result.extend(second)
+                break
+    result = ' and '.join([dn[n].lower() for n in result]).split(' ')
+    result[-1] += rest
+    return result
+
+def _rule_thru(words, i, s):
+    """Handle things like "Mon-Sat", "Fri thru Sun", "tuesdays through thursdays" """
+    first, dash, rest = words[i].partition('-')
+    if dash:
+        m = RE_DAY_NAME.match(rest)
+        if m and RE_DAY_NAME.fullmatch(first):
+            return _thru_words(first, m.group(0), rest[m.end():]), 1, False
+        return None
+    if i + 2 < len(words) and (words[i + 1] == 'thru' or words[i + 1] == 'through'):
+        m = RE_DAY_NAME.match(words[i + 2])
+        if m and RE_DAY_NAME.fullmatch(first):
+            return _thru_words(first, m.group(0), words[i + 2][m.end():]), 3, False
+    return None
+
+# Rules for the whole phrase, before it's split into clauses
+PHRASE_REWRITER.add_rule('phrase', _rule_begin_end_of, words=('beginning', 'begin', 'start', 'ending', 'end'))
+PHRASE_REWRITER.add_rule('phrase', _rule_at_begin_end, words=('at',))
+# Rules for the event clause
+PHRASE_REWRITER.add_rule('event', _rule_ord_interval, types=('ordinal',))
+PHRASE_REWRITER.add_rule('event', _rule_thru, types=('DoW', 'plural_weekday'))
 
 def handle_begin_end(s):                # Issue #12
-    def sub_be1(m):
-        if m.group('be').startswith('e'):
-            return 'last of'
-        else:
-            return 'first of'
-    def sub_be2(m):
-        if m.group('be').startswith('e'):
-            return 'on the last'
-        else:
-            return 'on the first'
-    s = re.sub(RE_BEGIN_END_OF, sub_be1, s)
-    s = re.sub(RE_AT_BEGIN_END, sub_be2, s)
-    return s
+    return PHRASE_REWRITER.rewrite('phrase', s)
 
 class Token(object):
-    def __init__(self, text, all_text, type_):
+    __slots__ = ('text', 'type_', 'start', 'end')
+
+    def __init__(self, text, type_, start=None, end=None):
         self.text = text
-        self.all_text = all_text
         self.type_ = type_
+        self.start = start      # Offsets of the word in the tokenized text
+        self.end = end
 
     def __repr__(self):
         return '<Token %s: %s>' % (self.text, self.type_)
@@ -108,6 +476,7 @@ class Tokenizer(list):
             ('MoY', RE_MOY),
             ('instances', RE_BYSETPOS)
             )
+    CONTENT_TYPE_NAMES = frozenset(type_ for type_, regex in CONTENT_TYPES)
     TYPES = CONTENT_TYPES + (
             ('ambigmod', RE_AMBIGMOD),
             ('starting', RE_STARTING),
@@ -118,34 +487,613 @@ class Tokenizer(list):
             ('other', RE_OTHER),
             ('ampm', RE_AMPM),      # Issue #13
         )
+    # All of TYPES as one alternation, tried in priority order, whose first matching branch names the
+    # token's type.  Named groups inside the individual patterns are made non-capturing so that
+    # lastgroup is always the type.
+    RE_CLASSIFIER = lazy_compile('|'.join('(?P<%s>%s)' % (type_, re.sub(r'\(\?P<\w+>', '(?:', regex.pattern))
+        for type_, regex in TYPES))
+
+    # The vocabulary is small and repeats a lot, so classifications are memoized across parsers and
+    # threads.  Resize with Tokenizer.cache.resize(n); Tokenizer.cache.info() has the hit rate.
+    cache = LRUCache(4096)
+
+    @classmethod
+    def classify(cls, word):
+        """Return the type of the first of TYPES that matches `word`, or None"""
+        type_ = cls.cache.get(word, MISSING)
+        if type_ is MISSING:
+            m = cls.RE_CLASSIFIER.match(word)
+            type_ = m.lastgroup if m else None
+            cls.cache.put(word, type_)
+        return type_
 
     def __init__(self, text):
         super(Tokenizer, self).__init__(self)
         self.text = text
-        s = self.text
+        self.stream = TokenStream(text)
         self._index = 0
-        self.all_ = []
-        for token in s.split():
-            for type_, regex in self.TYPES:
-                m = regex.match(token)
+        self.extend(self.stream.tokens())
+        log.debug("tokenized '%s'\n%s", self.text, self)
+
+    @property
+    def all_(self):
+        """Every word, including those with no type"""
+        typed = dict((t.start, t) for t in self)
+        stream = self.stream
+        return [typed.get(stream.starts[i]) or stream.token(i) for i in range(len(stream))]
+
+TYPE_NAMES = tuple(type_ for type_, regex in Tokenizer.TYPES)
+TYPE_CODES = dict((type_, code) for code, type_ in enumerate(TYPE_NAMES))
+NO_TYPE = 255
+RE_WORD = lazy_compile(r'\S+')
+
+class TokenStream(object):
+    """A compact tokenization of `text`: parallel arrays of each word's start offset, end offset and
+    type code (an index into TYPE_NAMES, or NO_TYPE).  Words are kept as offsets into the text
+    rather than copied, and Token objects are only built on request."""
+    __slots__ = ('text', 'starts', 'ends', 'codes')
+
+    def __init__(self, text):
+        self.text = text
+        self.starts = starts = array('L')
+        self.ends = ends = array('L')
+        self.codes = codes = bytearray()
+        classify = Tokenizer.classify
+        for m in RE_WORD.finditer(text):
+            start, end = m.span()
+            starts.append(start)
+            ends.append(end)
+            type_ = classify(m.group())
+            codes.append(NO_TYPE if type_ is None else TYPE_CODES[type_])
+
+    def __len__(self):
+        return len(self.codes)
+
+    def word(self, i):
+        return self.text[self.starts[i]:self.ends[i]]
+
+    def span(self, i):
+        return self.starts[i], self.ends[i]
+
+    def type_(self, i):
+        code = self.codes[i]
+        return None if code == NO_TYPE else TYPE_NAMES[code]
+
+    def token(self, i):
+        return Token(self.word(i), self.type_(i), self.starts[i], self.ends[i])
+
+    def tokens(self):
+        """Token objects for the words that have a type"""
+        return [self.token(i) for i, code in enumerate(self.codes) if code != NO_TYPE]
+
+    def slice(self, start, end):
+        """Token objects for the typed words of text[start:end], exactly as tokenizing that substring
+        would produce them: words cut by the slice boundaries are classified as the pieces inside it"""
+        text, starts, ends, codes = self.text, self.starts, self.ends, self.codes
+        tokens = []
+        i = bisect_right(ends, start)
+        n = len(codes)
+        while i < n and starts[i] < end:
+            ws, we = starts[i], ends[i]
+            if ws < start or we > end:
+                ws, we = max(ws, start), min(we, end)
+                type_ = Tokenizer.classify(text[ws:we])
+                if type_ is not None:
+                    tokens.append(Token(text[ws:we], type_, ws, we))
+            elif codes[i] != NO_TYPE:
+                tokens.append(Token(text[ws:we], TYPE_NAMES[codes[i]], ws, we))
+            i += 1
+        return tokens
+
+# The clause grammar, by word.  A word can play several roles, e.g. 'until' ends the event and closes a
+# "from ... until ..." range.
+ROLE_EXCEPT = 1
+ROLE_START = 2          # starting ...
+ROLE_END = 4            # ending/until ...
+ROLE_FROM = 8           # from ... to ...
+ROLE_TO = 16
+ROLE_LEAD = 32          # for/up, which can lead a count or a period
+ROLE_COUNT = 64         # can start a count: twice, 3x, 3 times, 4 occurrences
+ROLE_EVENT = 128        # can start the event: every, each, on, the, repeat, daily, mondays...
+ROLE_ORDINAL = 256      # can start the event when it comes before its start: 2nd, last...
+CLAUSE_WORDS = {'except': ROLE_EXCEPT, 'from': ROLE_FROM, 'to': ROLE_TO, 'through': ROLE_TO, 'thru': ROLE_TO,
+        'until': ROLE_TO, 'for': ROLE_LEAD, 'up': ROLE_LEAD}
+RE_START_WORD = lazy_compile(r'start(?:s|ing)?$')
+RE_END_WORD = lazy_compile(r'(?:end|until)(?:s|ing)?$')
+RE_COUNT_WORD = lazy_compile(r'\d|twice|%s' % '|'.join(numbers))
+RE_EVENT_WORD = lazy_compile(r'every|each|on\b|the\b|repeat|%s|%s' % (RE_DAILY.pattern, RE_PLURAL_WEEKDAY.pattern))
+RE_COUNT_CLAUSE = lazy_compile(r'(?:for\s+|(?:for\s+)?up\s+to\s+)?(?:(?P<twice>twice)|(?P<count>%s)(?:x|\s*times|\s*occurrences))'%RE_NUMBER_NOT_ANCHORED.pattern)
+RE_PERIOD_CLAUSE = lazy_compile(r'for\s+(?:the\s+next\s+|up\s+to\s+)?(?:(?P<unit1>week|month|year)|(?P<count>%s)\s*(?P<unit>weeks|months|years))'%RE_NUMBER_NOT_ANCHORED.pattern)
+
+class Clauses(object):
+    """The clauses of a phrase: the event, and the texts of its start and end dates, its count, its
+    period as (number, units) for increment_date ("for the next 2 weeks"), and its except clause;
+    each None if the phrase doesn't have it"""
+    __slots__ = ('event', 'start', 'end', 'count', 'period', 'except_')
+
+    # Word roles are memoized like token types.  Resize with Clauses.cache.resize(n).
+    cache = LRUCache(4096)
+
+    def __init__(self, event, start=None, end=None, count=None, period=None, except_=None):
+        self.event = event
+        self.start = start
+        self.end = end
+        self.count = count
+        self.period = period
+        self.except_ = except_
+
+    @classmethod
+    def roles(cls, word):
+        """The ROLE_* bits of `word`"""
+        roles = cls.cache.get(word)
+        if roles is None:
+            roles = CLAUSE_WORDS.get(word, 0)
+            if RE_START_WORD.match(word):
+                roles |= ROLE_START
+            if RE_END_WORD.match(word):
+                roles |= ROLE_END
+            if RE_COUNT_WORD.match(word):
+                roles |= ROLE_COUNT
+            if RE_EVENT_WORD.match(word):
+                roles |= ROLE_EVENT
+            if RE_ORDINAL_NOT_ANCHORED.match(word):
+                roles |= ROLE_ORDINAL
+            cls.cache.put(word, roles)
+        return roles
+
+    def _key(self):
+        return (self.event, self.start, self.end, self.count, self.period, self.except_)
+
+    def __eq__(self, other):
+        if not isinstance(other, Clauses):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __repr__(self):
+        return '<Clauses %s>' % ', '.join('%s=%r' % (name, v) for name, v in zip(self.__slots__, self._key())
+                if v is not None)
+
+def segment(s):
+    """Split the normalized phrase `s` into its Clauses in one pass over its words.
+
+    The phrase is "<event> except <dates>", where the event part is one of
+        starting <start> <event>            (the event must begin with every, each, on, the, ...)
+        <event> starting <start>            (the event is from its first every, each, ..., 2nd, ...)
+        <event> from <start> to <end>
+        <event>
+    and the last event or start in that list can end with "ending <end>", "<count> times" or "for the
+    next <count> weeks"."""
+    words = s.split(' ') if s else []
+    stop = len(words)           # The end of the event part
+    first_start = start_event = first_event = last_from = from_to = None
+    start_words = []
+    end_words = []
+    counts = []
+    periods = []
+    offset = 0
+    roles_of = Clauses.roles
+    for i, word in enumerate(words):
+        roles = roles_of(word)
+        if roles:
+            if roles & ROLE_EXCEPT:
+                stop = i
+                break
+            if roles & ROLE_START:
+                if first_start is None:
+                    first_start = i
+                start_words.append(i)
+            if roles & ROLE_EVENT and start_event is None and first_start is not None and i >= first_start + 2:
+                start_event = i
+            if roles & (ROLE_EVENT | ROLE_ORDINAL) and first_event is None:
+                first_event = i
+            if roles & ROLE_END:
+                end_words.append(i)
+            if roles & ROLE_FROM:
+                last_from = i
+            if roles & ROLE_TO and last_from is not None:
+                from_to = (last_from, i)
+            if roles & (ROLE_LEAD | ROLE_COUNT):
+                m = RE_COUNT_CLAUSE.match(s, offset)
                 if m:
-                    tok = Token(token, s, type_)
-                    self.append(tok)
-                    self.all_.append(tok)
+                    counts.append((i, 2 if m.group('twice') else get_number(m.group('count'))))
+                if roles & ROLE_LEAD:
+                    m = RE_PERIOD_CLAUSE.match(s, offset)
+                    if m:
+                        if m.group('unit1'):
+                            periods.append((0, i, (1, m.group('unit1') + 's')))
+                        else:
+                            periods.append((1, i, (get_number(m.group('count')), m.group('unit'))))
+        offset += len(word) + 1
+
+    def text(a, b):
+        return ' '.join(words[a:b])
+
+    clauses = Clauses(None)
+    if stop < len(words):
+        a = stop + 1
+        if a + 1 < len(words) and words[a] in ('for', 'on', 'in'):
+            a += 1
+        clauses.except_ = text(a, len(words))
+
+    def ending(a):
+        """The event or start from word `a`, less any ending, count or period"""
+        if end_words and end_words[-1] > a:
+            clauses.end = text(end_words[-1] + 1, stop)
+            return text(a, end_words[-1])
+        for i, count in counts:
+            if i >= a:
+                clauses.count = count
+                return text(a, i)
+        for kind, i, period in sorted(periods):
+            if i >= a:
+                clauses.period = period
+                return text(a, i)
+        return text(a, stop)
+
+    last_start = None
+    for i in reversed(start_words):
+        if i < stop - 1:        # A start needs something after it
+            last_start = i
+            break
+    if start_event is not None:
+        clauses.start = text(first_start + 1, start_event)
+        clauses.event = ending(start_event)
+    elif first_event is not None and last_start is not None and first_event < last_start:
+        clauses.event = text(first_event, last_start)
+        clauses.start = ending(last_start + 1)
+    elif from_to is not None:
+        clauses.event = text(0, from_to[0])
+        clauses.start = text(from_to[0] + 1, from_to[1])
+        clauses.end = text(from_to[1] + 1, stop)
+    else:
+        clauses.event = ending(0)
+    return clauses
+
+def _freeze(v):
+    if isinstance(v, list):
+        return tuple(_freeze(e) for e in v)
+    return v
+
+def _thaw(v):
+    if isinstance(v, tuple):
+        return [_thaw(e) for e in v]
+    return v
+
+CLAUSE_ATTRS = ('dtstart', 'until', 'count', 'exdate', 'exrule')   # Set from the start/end/except clauses
+EVENT_ATTRS = ('interval', 'freq', 'weekdays', 'ordinal_weekdays', 'byday', 'bymonthday', 'byyearday',
+        'bymonth', 'byhour', 'byminute', 'bysetpos', 'byweekno')            # Set from the event
+RRULE_ATTRS = CLAUSE_ATTRS + EVENT_ATTRS
+
+class ParseResult(object):
+    """The immutable outcome of parsing one phrase: the rrule params (as sorted (name, value) pairs),
+    the RFC rrule string for recurring phrases, the datetime for non-recurring ones, and whether
+    the phrase was recognised as recurring.  Results compare and hash by value."""
+    __slots__ = ('params', 'rfc', 'datetime', 'is_recurring', '_state')
+
+    def __init__(self, params, rfc, datetime, is_recurring, state=()):
+        object.__setattr__(self, 'params', params)
+        object.__setattr__(self, 'rfc', rfc)
+        object.__setattr__(self, 'datetime', datetime)
+        object.__setattr__(self, 'is_recurring', is_recurring)
+        object.__setattr__(self, '_state', state)
+
+    @classmethod
+    def from_event(cls, event, value):
+        """Snapshot the rrule state a RecurringEvent was left in by parsing to `value`"""
+        state = tuple((name, _freeze(getattr(event, name))) for name in RRULE_ATTRS)
+        is_recurring = event.__dict__.get('is_recurring')
+        if is_recurring is not None:
+            state += (('is_recurring', is_recurring),)
+        params = tuple(sorted((k, _freeze(v)) for k, v in event.get_params().items()))
+        return cls(params, value if isinstance(value, str) else None,
+                value if isinstance(value, datetime.datetime) else None, bool(is_recurring), state)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('ParseResult is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('ParseResult is immutable')
+
+    @property
+    def value(self):
+        """What RecurringEvent.parse returns: the RFC rrule string, the datetime, or None"""
+        return self.rfc if self.is_recurring else self.datetime
+
+    def get_params(self):
+        return dict((k, _thaw(v)) for k, v in self.params)
+
+    def restore(self, event):
+        """Put `event`'s rrule attributes back in the state this result was parsed into"""
+        for name, v in self._state:
+            setattr(event, name, _thaw(v))
+
+    def _key(self):
+        return (self.params, self.rfc, self.datetime, self.is_recurring)
+
+    def __eq__(self, other):
+        if not isinstance(other, ParseResult):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return '<ParseResult %r>' % (self.value,)
+
+class Plan(object):
+    """A phrase parsed as far as it goes without a reference date: its clauses, the plan for its except
+    clause and the rrule params of its event.  bind(now) resolves the rest (start, end and except
+    dates, "for the next 6 weeks", non-recurring dates) against `now` without reparsing, giving what
+    parse() returns with that now_date.  Plans are immutable, so one can be bound from many threads."""
+    __slots__ = ('parser', 'text', 'stream', 'clauses', 'except_plan', 'event_state', 'is_recurring',
+            'recurring_only')
+
+    def __init__(self, parser, text=None, stream=None, clauses=None, except_plan=None, event_state=(),
+            is_recurring=None, recurring_only=False):
+        for name, value in zip(self.__slots__, (parser, text, stream, clauses, except_plan, event_state,
+                is_recurring, recurring_only)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Plan is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Plan is immutable')
+
+    def bind(self, now=None):
+        """The RFC rrule string, datetime or None the phrase means relative to `now` (default: now)"""
+        worker = self.parser._worker()
+        worker.set_now_date(now)
+        return worker._bind(self)
+
+    def _key(self):
+        return (self.text, self.clauses, self.except_plan, self.event_state, self.is_recurring,
+                self.recurring_only)
+
+    def __eq__(self, other):
+        if not isinstance(other, Plan):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __repr__(self):
+        return '<Plan %r>' % (self.text,)
+
+# Template slots: words whose value a compiled plan only passes through, so a plan can be retargeted at
+# other words of the same kind.  Numbers and ordinals keep their digit count in their kind, and the
+# 2nd stays literal ('second' alone is ambiguous, Issue #16).
+RE_SLOT_NUMBER = lazy_compile(r'[1-9]\d?$')
+RE_SLOT_ORDINAL = lazy_compile(r'[1-9]\d?(?:st|nd|rd|th)$')
+RE_SLOT_DOW = lazy_compile('(?:%s)$' % ')$|(?:'.join(DoWs[:7]))
+RE_SLOT_MOY = lazy_compile('(?:%s)$' % ')$|(?:'.join(MoYs))
+RE_ORDINAL_WEEKDAY = lazy_compile(r'(-?\d+)([A-Z][A-Z])$')        # e.g. 2FR, -1MO
+SLOT_PROBES = {
+        'number1': ('7', '9', '6', '5', '4', '3', '8'),
+        'number2': ('37', '59', '46', '73', '85', '94', '61'),
+        'ordinal1': ('7th', '5th', '9th', '3rd', '6th', '4th'),
+        'ordinal2': ('13th', '19th', '23rd', '29th', '31st', '17th'),
+        'DoW': ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'),
+        'MoY': ('january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september',
+            'october', 'november', 'december'),
+        }
+
+def template_of(s):
+    """The template of the normalized phrase `s`, as (its words with each slot word replaced by
+    '<kind>', the slot words), or None if it has no slots.
+
+    Some words stay literal because their value steers the parse: a number or ordinal after a word
+    ending in 'at' or a weekday, and a weekday before one (RE_AT_TIME reads "sat 3" as a time), a
+    number before a word that RE_TIME could take for am/pm/o'clock, and weekdays wherever they are
+    collected in weekday order rather than phrase order (plural weekdays, day ranges, "every 3rd fri
+    and mon")."""
+    words = s.split(' ')
+    types = [Tokenizer.classify(w) for w in words]
+    n = len(words)
+    dows = [w for w, t in zip(words, types) if t == 'DoW']
+    dow_slots = not ('plural_weekday' in types or 'thru' in words or 'through' in words or
+            not all(RE_SLOT_DOW.match(w) for w in dows) or
+            (len(dows) > 1 and any(types[i] == 'ordinal' and types[i + 1] == 'DoW' for i in range(n - 1))))
+    key = []
+    values = []
+    for i, word in enumerate(words):
+        type_ = types[i]
+        kind = None
+        if type_ == 'number' or type_ == 'ordinal':
+            if i and (words[i - 1].endswith('at') or types[i - 1] == 'DoW'):
+                pass
+            elif type_ == 'number':
+                if RE_SLOT_NUMBER.match(word) and not (i + 1 < n and (words[i + 1][:1] in ('a', 'p', 'o') or
+                        types[i + 1] == 'MoY')):
+                    kind = 'number%d' % len(word)
+            elif RE_SLOT_ORDINAL.match(word) and word[:-2] != '2':
+                kind = 'ordinal%d' % (len(word) - 2)
+        elif type_ == 'DoW':
+            if dow_slots and not (i + 1 < n and words[i + 1][:1].isdigit()):
+                kind = 'DoW'
+        elif type_ == 'MoY' and RE_SLOT_MOY.match(word):
+            kind = 'MoY'
+        if kind is None:
+            key.append(word)
+        else:
+            key.append('<%s>' % kind)
+            values.append(word)
+    if not values:
+        return None
+    return tuple(key), values
+
+def _slot_values(kind, word):
+    """The values the slot `word` can give rrule params, as ({int: ...}, {str: ...}, {code: ...}) keys"""
+    if kind.startswith('number'):
+        n = get_number(word)
+        return (n,), (str(n),), ()
+    if kind.startswith('ordinal'):
+        o = get_ordinal_index(word)
+        return (o, -o), (str(o), str(-o)), (ordered_weekday_codes[o % 8],)
+    if kind == 'DoW':
+        return (), (), (get_DoW(word)[0],)
+    return (), (str(get_MoY(word)),), ()
+
+class Template(object):
+    """A compiled phrase whose slot words (see template_of) can be replaced by others of their kind
+    without reparsing.  A template is only made once a probe, the phrase with every slot word changed,
+    compiles to the retargeted plan."""
+    __slots__ = ('kinds', 'words', 'values', 'plan')
+
+    def __init__(self, kinds, words, plan):
+        self.kinds = kinds
+        self.words = words
+        self.values = [_slot_values(kind, word) for kind, word in zip(kinds, words)]
+        self.plan = plan
+
+    @classmethod
+    def verified(cls, parser, key, words, plan):
+        """The Template of `plan`, compiled by `parser` from the phrase with template `key` and slot
+        `words`, or None if the parse depends on the values of its slots"""
+        kinds = [k[1:-1] for k in key if k[:1] == '<']
+        if len(set(words)) < len(words):
+            return None
+        taken = set()
+        for kind, word in zip(kinds, words):
+            values = set().union(*_slot_values(kind, word))
+            if values & taken:
+                return None             # e.g. "march 3rd": which one made a 3?
+            taken.update(values)
+        probe = []
+        for kind in kinds:
+            for word in SLOT_PROBES[kind]:
+                values = set().union(*_slot_values(kind, word))
+                if not values & taken:
                     break
             else:
-                self.all_.append(Token(token, s, None))
-        log.debug("tokenized '%s'\n%s" %(self.text, self))
+                return None
+            taken.update(values)
+            probe.append(word)
+        slots = iter(probe)
+        text = ' '.join(next(slots) if k[:1] == '<' else k for k in key)
+        if template_of(text) != (key, probe):
+            return None
+        template = cls(kinds, words, plan)
+        if template.instantiate(parser, probe) != parser._worker()._compile_normalized(text):
+            return None
+        return template
+
+    def instantiate(self, parser, words):
+        """The plan of the phrase with the slot words `words`"""
+        # Maps from the values the template's slot words give rrule params to those `words` give
+        ints, strs, codes = maps = ({}, {}, {})
+        for kind, old, word in zip(self.kinds, self.values, words):
+            for m, keys, values in zip(maps, old, _slot_values(kind, word)):
+                m.update(zip(keys, values))
+        mapping = dict(zip(self.words, words))
+
+        def text(t):
+            if not t:
+                return t
+            return ' '.join([mapping.get(w, w) for w in t.split(' ')])
+
+        def value(v):
+            if isinstance(v, tuple):
+                return tuple([value(e) for e in v])
+            if isinstance(v, bool):
+                return v
+            if isinstance(v, int):
+                return ints.get(v, v)
+            if isinstance(v, str):
+                if v in strs:
+                    return strs[v]
+                if v in codes:
+                    return codes[v]
+                m = RE_ORDINAL_WEEKDAY.match(v)
+                if m:
+                    return strs.get(m.group(1), m.group(1)) + codes.get(m.group(2), m.group(2))
+            return v
+
+        def retarget(plan):
+            if plan.text is None:
+                return Plan(parser)
+            c = plan.clauses
+            clauses = Clauses(text(c.event), text(c.start), text(c.end), value(c.count), value(c.period),
+                    text(c.except_))
+            except_plan = retarget(plan.except_plan) if plan.except_plan is not None else None
+            # Without a token stream, binding tokenizes just the date fragments it parses
+            return Plan(parser, text(plan.text), None, clauses, except_plan,
+                    tuple([(name, value(v) if v else v) for name, v in plan.event_state]),
+                    plan.is_recurring, plan.recurring_only)
+        return retarget(self.plan)
+
+# Text with no digit and none of the words that dates are made of can't parse to anything, so
+# parse_result() answers it without running the pipeline.  The words are those Tokenizer classifies
+# as content, and the parsedatetime locale words that make a date without a number: day and month
+# names, "today", "noon", "now", the units ("a week") and the modifiers that stand alone ("eom").
+# The content patterns are matched at the start of each word, as the tokenizer does, with their
+# groups made non-capturing so that the regex engine can skip branches quickly.
+RE_DIGIT_OR_CONTENT_WORD = lazy_compile(r'\d|(?:^| )(?:%s)' % '|'.join(
+    re.sub(r'\((?!\?)', '(?:', regex.pattern).replace('^', '').replace('$', r'(?!\S)')
+    for type_, regex in Tokenizer.CONTENT_TYPES))
+RE_DIGIT = lazy_compile(r'\d')
+WORD_SEPARATOR_TABLE = str.maketrans('./:-', '    ')     # What normalize() leaves between words
+# Vocabularies by constants, dropped with them
+_locale_registry = weakref.WeakKeyDictionary()
+
+def _locale_vocabulary(parse_constants=None):
+    """locale_words() and locale_modifiers() of `parse_constants`, built on first use"""
+    if parse_constants is None:
+        parse_constants = get_constants()
+    vocabulary = _locale_registry.get(parse_constants)
+    if vocabulary is not None:
+        return vocabulary
+    consts = parse_constants
+    cal = import_parsedatetime().Calendar(constants=consts)
+    words = list(consts.Weekdays) + list(consts.Months) + list(consts.shortMonths) + \
+            list(consts.dayOffsets) + list(consts.re_sources) + list(consts.re_values['now']) + \
+            [w for w in consts.Modifiers if cal.parse(w)[1]]
+    for short in consts.shortWeekdays:
+        words.extend(short.split('|'))
+    for unit_words in consts.units.values():
+        words.extend(unit_words)
+    vocabulary = (frozenset(w.lower().split()[-1] for w in words),
+            frozenset(w.lower().split()[0] for w in consts.Modifiers))
+    _locale_registry[consts] = vocabulary
+    return vocabulary
+
+def locale_words(parse_constants=None):
+    """The words of `parse_constants`' locale that parsedatetime makes a date of without a number.
+    A phrase of several words contributes its last, which it can't match without."""
+    return _locale_vocabulary(parse_constants)[0]
+
+def locale_modifiers(parse_constants=None):
+    """The first words of `parse_constants`' modifiers ("next", "ago", "end of"...)"""
+    return _locale_vocabulary(parse_constants)[1]
+
+def may_be_date(s, parse_constants=None):
+    """False if the normalized text `s` has nothing date-like in it, in which case it parses to None"""
+    if RE_DIGIT_OR_CONTENT_WORD.search(s):
+        return True
+    return not locale_words(parse_constants).isdisjoint(s.translate(WORD_SEPARATOR_TABLE).split())
+
+class TraceEvent(object):
+    """A step of a parse, as passed to RecurringEvent.trace: `stage` names the step, `text` is the
+    text it worked on and `value` what it found"""
+    __slots__ = ('stage', 'text', 'value')
+
+    def __init__(self, stage, text, value=None):
+        self.stage = stage
+        self.text = text
+        self.value = value
+
+    def __repr__(self):
+        return '<TraceEvent %s: %r -> %r>' % (self.stage, self.text, self.value)
+
+NOW_DEPENDENT = object()    # result_cache marker for phrases whose parse reads the reference date
 
 class RecurringEvent(object):
-    def __init__(self, now_date=None, preferred_time_range=(8, 19), parse_constants: parsedatetime.Constants=None):
-        if now_date is None:
-            now_date = datetime.datetime.now()
-        if isinstance(now_date, datetime.date) and not isinstance(now_date, datetime.datetime):
-            now_date = datetime.datetime(now_date.year, now_date.month, now_date.day)
-        self.now_date = now_date
+    def __init__(self, now_date=None, preferred_time_range=(8, 19), parse_constants: 'parsedatetime.Constants'=None):
+        self._now_used = [False]    # Set when now_date is read; shared with this parser's workers
+        self.set_now_date(now_date)
         self.preferred_time_range = preferred_time_range
-        self.pdt = parsedatetime.Calendar(constants=parse_constants)
+        self.parse_constants = parse_constants
+        self._pdt = None        # A Calendar assigned to pdt, used instead of the shared one
+        self._stream = None     # The token stream shared by the stages of the current parse
         self._reset()
         
         if parse_constants and parse_constants.use24:
@@ -153,6 +1101,33 @@ class RecurringEvent(object):
             # will not break pm specification
             preferred_time_range = (0,12)
 
+    def set_now_date(self, now_date=None):
+        """Rebind the reference date that relative phrases are resolved against (default: now)"""
+        if now_date is None:
+            now_date = datetime.datetime.now()
+        if isinstance(now_date, datetime.date) and not isinstance(now_date, datetime.datetime):
+            now_date = datetime.datetime(now_date.year, now_date.month, now_date.day)
+        self.now_date = now_date
+
+    @property
+    def now_date(self):
+        self._now_used[0] = True
+        return self._now_date
+
+    @now_date.setter
+    def now_date(self, now_date):
+        self._now_date = now_date
+
+    @property
+    def pdt(self):
+        if self._pdt is not None:
+            return self._pdt
+        return get_calendar(self.parse_constants)
+
+    @pdt.setter
+    def pdt(self, pdt):
+        self._pdt = pdt
+
     def _reset(self):
         # rrule params
         self.dtstart = None
@@ -238,19 +1213,185 @@ class RecurringEvent(object):
                 result += exdate
         return result
 
-    def parse(self, s):
+    def parse(self, s, timeout=None):
         # returns a rrule string if it is a recurring date, a datetime.datetime
-        # if it is a non-recurring date, and None if it is neither.
-        self._reset()
-        if not s:
+        # if it is a non-recurring date, and None if it is neither.  With a timeout (in seconds),
+        # returns TIMED_OUT, leaving the instance as it was, if parsing takes longer than that.
+        result = self.parse_result(s, timeout)
+        if result is TIMED_OUT:
+            return result
+        result.restore(self)
+        return result.value
+
+    # Whole-parse results, shared by all parsers.  Off by default: turn it on with
+    # RecurringEvent.result_cache.resize(n).  Entries are keyed on the normalized phrase and the
+    # settings that affect it, plus the reference date for phrases whose parse read it ("until next
+    # month" does, "tuesdays" does not); those leave a NOW_DEPENDENT marker under the undated key.
+    result_cache = LRUCache(0)
+
+    # Longer input parses to None.  recurrent's own stages take time linear in the length of the
+    # input, but parsedatetime rescans the rest of the text after each date word it finds, so its time
+    # grows with the square of the length; a limit bounds it.  Off (None) by default, since long
+    # text such as an email body is real input; deployments that take untrusted input can set one.
+    max_input_length = None
+
+    # Skip the pipeline for text with nothing date-like in it (see may_be_date).  None, the default,
+    # uses it for RecurringEvent itself but not for subclasses, which may recognise words recurrent and
+    # parsedatetime don't (like the canonical phrases, which are only looked up for RecurringEvent);
+    # True uses it in a subclass too and False turns it off.
+    prefilter = None
+
+    # A function to call with a TraceEvent for each step of a parse, to see how phrases are read and
+    # which paths they take.  The stages and their values:
+    #   too_long, prefilter         the text was answered with None without parsing
+    #   canonical, result_cache     the result was looked up (a ParseResult)
+    #   template                    the phrase's plan was instantiated from a template (a Plan)
+    #   segment                     the phrase split into its clauses (a Clauses)
+    #   tokens                      the typed words of the event clause (a list of Token)
+    #   event                       the event clause's rrule params, or None if it isn't recurring (a dict)
+    #   exdates                     the dates of an except clause (a list)
+    #   date_cache, singleton,      a date, looked up, read as an ordinal date ("3rd tue in may"), or
+    #   parsedatetime, too_complex  by parsedatetime, or not tried because the text is too long
+    # None (the default) costs one attribute check per step.  Set it on an instance or on the class.
+    trace = None
+
+    def parse_result(self, s, timeout=None):
+        """Parse `s` without touching this instance's state, so one RecurringEvent can be shared
+        across threads and tasks.  Returns a ParseResult, or TIMED_OUT if a timeout (in seconds) is
+        given and parsing takes longer."""
+        if timeout is not None:
+            return call_with_timeout(timeout, self.parse_result, s)
+        if s and self.max_input_length is not None and len(s) > self.max_input_length:
+            log.debug('not parsing %d characters, over max_input_length', len(s))
+            self.counters.add('too_long')
+            if self.trace is not None:
+                self.trace(TraceEvent('too_long', s))
+            return no_date_result()
+        if s:
+            text = normalize(s)
+            if type(self) is RecurringEvent:
+                result = self._canonical_result(text)
+                if result is not None:
+                    self.counters.add('canonical')
+                    if self.trace is not None:
+                        self.trace(TraceEvent('canonical', text, result))
+                    return result
+            prefilter = self.prefilter
+            if prefilter is None:
+                prefilter = type(self) is RecurringEvent
+            if prefilter and not may_be_date(text, self.parse_constants):
+                self.counters.add('prefilter')
+                if self.trace is not None:
+                    self.trace(TraceEvent('prefilter', text))
+                return no_date_result()
+        cache = self.result_cache
+        if not cache.maxsize or not s:
+            worker = self._worker()
+            return ParseResult.from_event(worker, worker._parse(s))
+        key = (normalize(s), type(self), tuple(self.preferred_time_range), self.parse_constants, self._pdt)
+        dated_key = key + (self._now_date, self._now_date.tzinfo)
+        if cache.peek(key) is NOW_DEPENDENT:
+            key = dated_key
+        result = cache.get(key, MISSING)
+        if result is MISSING:
+            worker = self._worker()
+            worker._now_used = now_used = [False]
+            result = ParseResult.from_event(worker, worker._parse(s))
+            if now_used[0]:
+                cache.put(key, NOW_DEPENDENT)
+                key = dated_key
+            cache.put(key, result)
+        elif self.trace is not None:
+            self.trace(TraceEvent('result_cache', key[0], result))
+        return result
+
+    def _canonical_result(self, s):
+        """The result for the normalized text `s` if it is one of CANONICAL_PHRASES, optionally
+        followed by "at <time>", or None"""
+        results = canonical_results()
+        result = results.get(s)
+        if result is not None:
+            return result
+        phrase, at, time = s.partition(' at ')
+        result = results.get(phrase) if at else None
+        if result is None:
+            return None
+        m = RE_TIME.fullmatch(time)
+        if not m:
             return None
+        worker = self._worker()
+        result.restore(worker)
+        worker.add_time(m)
+        return ParseResult.from_event(worker, worker.get_RFC_rrule())
+
+    def _worker(self):
+        """A scratch copy of this parser's settings with fresh rrule state"""
+        self.counters.add('workers')
+        worker = object.__new__(self.__class__)
+        worker.__dict__.update(self.__dict__)
+        worker.__dict__.pop('is_recurring', None)
+        worker._reset()
+        return worker
+
+    def compile(self, s):
+        """Parse `s` as far as it goes without the reference date.  Returns a Plan; plan.bind(now)
+        is parse(s) with now_date=now, minus the work that doesn't depend on now."""
+        return self._worker()._compile(s)
+
+    def _parse(self, s, stream=None, recurring_only=False):
+        return self._bind(self._compile(s, stream, recurring_only))
+
+    # Plans by phrase template (see template_of), shared by all parsers.  Off by default: turn it on
+    # with RecurringEvent.template_cache.resize(n).  Templates whose parse turned out to depend on
+    # their slot values are remembered as None.
+    template_cache = LRUCache(0)
+
+    def _compile(self, s, stream=None, recurring_only=False):
+        if not s:
+            return Plan(self)
         s = normalize(s)
+        if stream is None and not recurring_only and self.template_cache.maxsize:
+            return self._compile_template(s)
+        return self._compile_normalized(s, stream, recurring_only)
+
+    def _compile_template(self, s):
+        template = template_of(s)
+        if template is None:
+            return self._compile_normalized(s)
+        key, words = template
+        cache = self.template_cache
+        cache_key = (key, type(self), tuple(self.preferred_time_range), self.parse_constants, self._pdt)
+        entry = cache.get(cache_key, MISSING)
+        if entry is MISSING:
+            plan = self._compile_normalized(s)
+            cache.put(cache_key, Template.verified(self, key, words, plan))
+            return plan
+        if entry is None:
+            return self._compile_normalized(s)
+        plan = entry.instantiate(self, words)
+        if self.trace is not None:
+            self.trace(TraceEvent('template', s, plan))
+        return plan
+
+    def _compile_normalized(self, s, stream=None, recurring_only=False):
         s = handle_begin_end(s)         # Issue #12
-        event = self.parse_start_and_end(s)
-        if not event:
-            return None
-        self.is_recurring = self.parse_event(event)
-        if self.is_recurring:
+        # Tokenize once; every stage works on slices of this stream (see _tokens)
+        if stream is None or s not in stream.text:
+            stream = TokenStream(s)
+        self._stream = stream
+        clauses = segment(s)
+        if self.trace is not None:
+            self.trace(TraceEvent('segment', s, clauses))
+        check_deadline()
+        # Only the RRULE of an except clause is used, so an except inside it ("daily except on
+        # mondays except in june") changes nothing; skipping it keeps a chain of them from recursing
+        except_plan = None if recurring_only else self._compile_except(clauses)
+        event = clauses.event
+        is_recurring = None
+        if event:
+            check_deadline()
+            is_recurring = self.parse_event(event)
+        if is_recurring:
             # get time if its obvious
             m = RE_AT_TIME.search(event)
             if not m:                       # Issue #13
@@ -258,16 +1399,42 @@ class RecurringEvent(object):
                 if m and not RE_DEF_TIME.search(m.group(0)):    # Issue #13: We have to be sure this is a time
                     m = None                # Issue #13
             if m:
-                self.byhour.append(str(self.get_hour(m.group('hour'), m.group('mod'))))
-                mn = m.group('minute')
-                if mn is None:
-                    mn = 0
-                try:
-                    mn = int(mn)
-                    self.byminute.append(str(mn))
-                except ValueError:      # pragma nocover
-                    pass
+                self.add_time(m)
+        event_state = tuple((name, _freeze(getattr(self, name))) for name in EVENT_ATTRS)
+        if event and self.trace is not None:
+            self.trace(TraceEvent('event', event, self.get_params() if is_recurring else None))
+        return Plan(self, s, stream, clauses, except_plan, event_state, is_recurring, recurring_only)
+
+    def add_time(self, m):
+        """Set the time of day from a RE_TIME match"""
+        self.byhour.append(str(self.get_hour(m.group('hour'), m.group('mod'))))
+        mn = m.group('minute')
+        if mn is None:
+            mn = 0
+        try:
+            mn = int(mn)
+            self.byminute.append(str(mn))
+        except ValueError:      # pragma nocover
+            pass
+
+    def _bind(self, plan):
+        """Finish parsing `plan` against this parser's now_date"""
+        s = plan.text
+        if s is None:
+            return None
+        self._stream = plan.stream
+        check_deadline()
+        self.apply_clauses(plan.clauses, plan.except_plan)
+        if not plan.clauses.event:
+            return None
+        check_deadline()
+        for name, v in plan.event_state:
+            setattr(self, name, _thaw(v))
+        self.is_recurring = plan.is_recurring
+        if self.is_recurring:
             return self.get_RFC_rrule()
+        if plan.recurring_only:
+            return None
         date = self.parse_date(s)
         if date is not None:
             date, found = self.parse_time(s, date)
@@ -278,6 +1445,16 @@ class RecurringEvent(object):
             return date
         return None
 
+    def _tokens(self, s):
+        """The typed tokens of `s`, sliced from the current parse's token stream when `s` is part of
+        its text (tokenizing is word by word, so any occurrence gives the same tokens)"""
+        stream = self._stream
+        if stream is not None:
+            start = stream.text.find(s)
+            if start >= 0:
+                return stream.slice(start, start + len(s))
+        return list(Tokenizer(s))
+
     def parse_time(self, s, dt):
         m = RE_AT_TIME.search(s)
         if not m:                       # Issue #13
@@ -334,71 +1511,36 @@ class RecurringEvent(object):
             return d + datetime.timedelta(days=amount*multiplier)
 
     def parse_start_and_end(self, s):
-        m = RE_EXCEPT.match(s)
-        if m:
-            s = m.group('event')
-            exc = m.group('except')
-            # Handle either a recurrence or a list of dates or months
-            r = RecurringEvent(now_date=self.now_date, preferred_time_range=self.preferred_time_range)
-            rfc = r.parse(exc)
-            if isinstance(rfc, str):
+        """Interpret the clauses of `s` other than the event, returning the event"""
+        clauses = segment(s)
+        self.apply_clauses(clauses, self._compile_except(clauses))
+        return clauses.event
+
+    def _compile_except(self, clauses):
+        if clauses.except_ is None:
+            return None
+        return self._worker()._compile(clauses.except_, self._stream, recurring_only=True)
+
+    def apply_clauses(self, clauses, except_plan=None):
+        """Set the rrule params that come from the start, end and except clauses"""
+        if except_plan is not None:
+            # Handle either a recurrence or a list of dates or months.  The dates are parsed one by one,
+            # so don't parse the whole clause as a date first.
+            rfc = self._worker()._bind(except_plan)
+            if rfc:
                 self.exrule = RE_RRULE.search(rfc).group('rr')
             else:
-                self.exdate = self.extract_exdates(m.group('except'))
-        m = RE_START_EVENT.search(s)
-        if m:
-            self.dtstart = self.parse_date(m.group('starting'))
-            event = self.extract_ending(m.group('event'))
-            return event
-        m = RE_EVENT_START.search(s)
-        if m:
-            event = m.group('event')
-            start = self.extract_ending(m.group('starting'))
-            self.dtstart = self.parse_date(start)
-            if self.until and self.until < self.dtstart:       # e.g. from Nov to Jun
+                self.exdate = self.extract_exdates(clauses.except_)
+        if clauses.start is not None:
+            self.dtstart = self.parse_date(clauses.start)
+        if clauses.end is not None:
+            self.until = self.parse_date(clauses.end)
+            if self.until and self.dtstart and self.until < self.dtstart:       # e.g. from Nov to Jun
                 self.until = self.increment_date(self.until, 1)
-            return event
-        m = RE_FROM_TO.search(s)
-        if m:
-            event = m.group('event')
-            self.dtstart = self.parse_date(m.group('starting'))
-            self.until = self.parse_date(m.group('ending'))
-            if self.until < self.dtstart:       # e.g. from Nov to Jun
-                self.until = self.increment_date(self.until, 1)
-            return event
-
-        return self.extract_ending(s)
-
-    def extract_ending(self, s):
-        m = RE_OTHER_END.search(s)
-        if m:
-            self.until = self.parse_date(m.group('ending'))
-            if self.dtstart and self.until < self.dtstart:       # e.g. starting Nov until Jun
-                self.until = self.increment_date(self.until, 1)
-            return m.group('other')
-        m = RE_COUNT.search(s)
-        if m:
-            event = m.group('event')
-            twice = m.group('twice')
-            count = m.group('count')
-            if twice:
-                count = 2
-            self.count = get_number(count)
-            return event
-        m = RE_COUNT_UNTIL1.search(s)
-        if m:
-            event = m.group('event')
-            unit = m.group('unit')
-            self.until = self.increment_date(self.now_date, 1, unit + 's')
-            return event
-        m = RE_COUNT_UNTIL.search(s)
-        if m:
-            event = m.group('event')
-            count = m.group('count')
-            unit = m.group('unit')
-            self.until = self.increment_date(self.now_date, get_number(count), unit)
-            return event
-        return s
+        elif clauses.count is not None:
+            self.count = clauses.count
+        elif clauses.period is not None:
+            self.until = self.increment_date(self.now_date, *clauses.period)
 
     def extract_exdates(self, s):
         """Walk thru the "except on" dates and create a list of them, noting which ones have no times specified"""
@@ -427,7 +1569,9 @@ class RecurringEvent(object):
                     dt = dt.date()      # Didn't find any definite times
 
                 result.append(dt)
-        log.debug(f'extract_exdates({s}) = {result}')
+        log.debug('extract_exdates(%s) = %s', s, result)
+        if self.trace is not None:
+            self.trace(TraceEvent('exdates', s, result))
         return result
 
     def adjust_exdates(self, rrules, exdate):
@@ -455,10 +1599,11 @@ class RecurringEvent(object):
         if needs_time:
             new_exdate = []
             try:
-                from dateutil.rrule import rrulestr
+                self.counters.add('rrulestr_adjust_exdates')
                 rs = rrulestr(rrules, dtstart=self.now_date)
                 ndx = 0
                 for r in rs:
+                    check_deadline()
                     while True:
                         ex = exdate[ndx]
                         if isinstance(ex, datetime.datetime):
@@ -493,76 +1638,85 @@ class RecurringEvent(object):
                     if ndx >= len(exdate):
                         break
                 exdate = new_exdate
+            except DeadlineExceeded:
+                raise
             except Exception as e:      # pragma nocover
-                log.debug(f'adjust_exdates({rrules}, {exdate}): Exception {e}')
+                self.counters.add('adjust_exdates_errors')
+                log.debug('adjust_exdates(%s, %s): Exception %s', rrules, exdate, e)
         result = [e.strftime('%Y%m%dT%H%M%S') for e in exdate]
-        log.debug(f'adjust_exdates({rrules}, {exdate}) = {result}')
+        log.debug('adjust_exdates(%s, %s) = %s', rrules, exdate, result)
         return result
 
+    # parse_date results, shared by all parsers.  A result depends only on the fragment, the reference
+    # date (and its tzinfo, which equality ignores), the parser class, since a subclass may read dates
+    # differently, the parsedatetime constants, which stand for the locale, and any Calendar assigned to
+    # pdt; the constants object itself is part of the key, so a new one never sees stale entries.  Call
+    # RecurringEvent.date_cache.clear() after mutating a Constants instance in place.
+    date_cache = LRUCache(4096)
+
     def parse_date(self, date_string):
+        key = (date_string, self.now_date, self.now_date.tzinfo, type(self), self.parse_constants, self._pdt)
+        result = self.date_cache.get(key, MISSING)
+        if result is MISSING:
+            result = self._parse_date(date_string)
+            self.date_cache.put(key, result)
+        elif self.trace is not None:
+            self.trace(TraceEvent('date_cache', date_string, result))
+        return result
+
+    def _parse_date(self, date_string):
         result = self.parse_singleton(date_string)
         if result:
-            log.debug(f"parsed date string '{date_string}' to {result}")
+            log.debug("parsed date string '%s' to %s", date_string, result)
+            if self.trace is not None:
+                self.trace(TraceEvent('singleton', date_string, result))
             return result
+        if self.too_complex_for_pdt(date_string):
+            self.counters.add('parsedatetime_skipped')
+            if self.trace is not None:
+                self.trace(TraceEvent('too_complex', date_string))
+            return None
+        check_deadline()
+        result = self.parse_with_pdt(date_string)
+        if self.trace is not None:
+            self.trace(TraceEvent('parsedatetime', date_string, result))
+        return result
+
+    def parse_with_pdt(self, date_string):
+        self.counters.add('parsedatetime')
         timestruct, result = self.pdt.parse(date_string, self.now_date)
         if result:
-            log.debug( "parsed date string '%s' to %s" %(date_string,
-                    timestruct[:6]))
+            log.debug("parsed date string '%s' to %s", date_string, timestruct[:6])
             return datetime.datetime(*timestruct[:6])
         return None
 
-    def eat_times(self, tokens):              # Issue #13
-        # Handle things like "at 10" or "10 am" and eat the 'number' token since we handle it elsewhere
-        for i in range(len(tokens)):
-            if tokens[i].type_ == 'number' and \
-              ((i+1 < len(tokens) and tokens[i+1].type_ == 'ampm') or \
-               (i != 0 and tokens[i-1].type_ == 'sep' and tokens[i-1].text == 'at')):
-                #log.debug(f'eat_times: del {tokens[i]}')
-                del tokens[i]
-                break
-        return tokens
-
-    def fixup_ord_intervals(self, s):
-        def ord_sub(m):         # Replace every 2nd day => every 2 days; every 3rd month => every 3 months; every 4th year => every 4 years; every 5th fri => every 5 fridays
-            ordx = get_ordinal_index(m.group('ord'))
-            unit = m.group('unit')
-            if unit == 'day' and ('week' in s or 'month' in s or 'year' in s):   # e.g. last day of each month; every year on the 31st day
-                return m.group(0)               # Don't change this kind!
-            if unit == 'day' or unit == 'week' or unit == 'month' or unit == 'year':
-                unit += 's'
-            elif RE_MOY_NOT_ANCHORED.search(s) or 'week' in s or 'month' in s:     # e.g. fourth thu of march, third fri of each month
-                return m.group(0)                                   # Don't change this kind!
-            else:
-                unit = ' and '.join([plural_day_names[u].lower() for u in get_DoW(unit)])
-            return f'{ordx} {unit}'
-
-        if not RE_REPEAT.search(s):
-            return s
-        return re.sub(RE_ORD_DAY_WEEK_MONTH_OR_YEAR, ord_sub, s)
-
-    def process_thru(self, s):
-        """Handle things like "Mon-Sat", "Fri thru Sun", "tuesdays through thursdays" """
-        def sub_thru(m):
-            first = m.group('first')
-            second = m.group('second')
-            dn = plural_day_names if first.endswith('s') or second.endswith('s') else day_names
-            first = get_DoW(first)
-            second = get_DoW(second)
-            result = []
-            if first == second:     # Mon-Mon
-                result.extend(first)
+    # parsedatetime scans the rest of the text again for each date word it finds, so its time grows
+    # with the number of date words times the length of the text, and it evaluates a modifier ("next",
+    # "ago"...) by parsing the rest of the text again, more than once when what follows isn't a plain
+    # date, so its time grows exponentially with the number of modifiers: "next last " * 16 takes
+    # minutes.  Text with more date words or modifiers than these isn't handed to it; real phrases
+    # have a handful of date words and three or four modifiers at most.
+    MAX_DATE_WORDS = 32
+    MAX_MODIFIERS = 8
+
+    def too_complex_for_pdt(self, date_string):
+        text_words = date_string.translate(WORD_SEPARATOR_TABLE).split()
+        if len(text_words) <= min(self.MAX_MODIFIERS, self.MAX_DATE_WORDS):
+            return False        # Without building the locale's vocabulary, which is slow for new constants
+        words = locale_words(self.parse_constants)
+        modifiers = locale_modifiers(self.parse_constants)
+        date_words = n_modifiers = 0
+        for word in text_words:
+            if word in modifiers:
+                n_modifiers += 1
+            elif word in words or RE_DIGIT.search(word):
+                date_words += 1
             else:
-                while True:
-                    result.extend(first)
-                    first = [next_day[first[-1]]]
-                    if first[0] == second[0]:
-                        result.extend(second)
-                        break
-            result = ' and '.join([dn[n].lower() for n in result])
-            log.debug(f'process_thru({s}) = {result}')
-            return result
-
-        return re.sub(RE_THRU, sub_thru, s)
+                continue
+            if n_modifiers > self.MAX_MODIFIERS or date_words > self.MAX_DATE_WORDS:
+                log.debug("not parsing '%s' with parsedatetime: too many date words", date_string)
+                return True
+        return False
 
     def handle_Nth_to_the_last(self, tokens):       # Issue #18
         """Differentiate between 2nd and last vs. 2nd to the last or 2nd last. For
@@ -576,22 +1730,47 @@ class RecurringEvent(object):
                         if tokens[j].text == 'and':
                             break
                     elif tokens[j].type_ == 'ordinal':
-                        tokens[j].text = '-' + tokens[j].text
-                        del tokens[i]
-                        i -= 1
+                        if not tokens[j].text.startswith('-'):     # Not one a 'last' has marked already
+                            tokens[j].text = '-' + tokens[j].text
+                            del tokens[i]
+                            i -= 1
+                        break
             i += 1
         return tokens
 
     def parse_event(self, s):
-        s = self.fixup_ord_intervals(s)
-        s = self.process_thru(s)
-        tokens = Tokenizer(s)
+        s = PHRASE_REWRITER.rewrite('event', s)
+        tokens = self._tokens(s)
         tokens = self.handle_Nth_to_the_last(tokens)        # Issue #18
-        tokens = self.eat_times(tokens)      # Issue #13
-        tokens = [t for t in tokens if t.type_ in [x[0] for x in Tokenizer.CONTENT_TYPES] ]
-        if not tokens:
+        if self.trace is not None:
+            self.trace(TraceEvent('tokens', s, tokens))
+        # Keep the content tokens, in one pass noting their types, dropping the first 'every' (the recurring
+        # phrases don't need it), and eating the first number that's a time, e.g. "at 10" or "10 am", since we
+        # handle it elsewhere (Issue #13)
+        content_types = Tokenizer.CONTENT_TYPE_NAMES
+        content = []
+        types = set()
+        number = None
+        ate_time = False
+        n = len(tokens)
+        for i, t in enumerate(tokens):
+            type_ = t.type_
+            if type_ not in content_types:
+                continue
+            if type_ == 'number':
+                if not ate_time and ((i + 1 < n and tokens[i + 1].type_ == 'ampm') or
+                        (i != 0 and tokens[i - 1].type_ == 'sep' and tokens[i - 1].text == 'at')):
+                    ate_time = True
+                    continue
+                if number is None:
+                    number = t
+            elif type_ == 'every' and 'every' not in types:
+                types.add(type_)
+                continue
+            types.add(type_)
+            content.append(t)
+        if not types:
             return False
-        types = set([t.type_ for t in tokens])
 
         # daily
         if 'daily' in types:
@@ -601,30 +1780,22 @@ class RecurringEvent(object):
 
         # explicit weekdays
         if 'plural_weekday' in types and 'ordinal' not in types:
-            def plural_weekday_interval():
-                if 'bi' in s or 'every other' in s:
-                    return 2
-                elif 'number' in types:
-                    i = ([t.type_ for t in tokens]).index('number')
-                    n = get_number(tokens[i].text)
-                    if n is not None:
-                        return n
-                return 1
-
+            if 'bi' in s or 'every other' in s:
+                interval = 2
+            elif number is not None:
+                interval = get_number(number.text)
+            else:
+                interval = 1
+            self.interval = interval
+            self.freq = 'weekly'
             if 'weekdays' in s:
                 # "RRULE:FREQ=WEEKLY;WKST=MO;BYDAY=MO,TU,WE,TH,FR"
-                self.interval = plural_weekday_interval()
-                self.freq = 'weekly'
                 self.weekdays = ['MO','TU','WE','TH','FR']
             elif 'weekends' in s:
-                self.interval = plural_weekday_interval()
-                self.freq = 'weekly'
                 self.weekdays = ['SA','SU']
             else:
                 # a plural weekday can really only mean one
                 # of two things, weekly or biweekly
-                self.freq = 'weekly'
-                self.interval = plural_weekday_interval()
                 for i, dow in enumerate(RE_DOWS):
                     if dow.search(s):
                         #this supports "thursdays and fridays"
@@ -633,192 +1804,252 @@ class RecurringEvent(object):
 
         # recurring phrases
         if 'every' in types or 'recurring_unit' in types:
-            if 'every other' in s:
-                self.interval = 2
-            else:
-                self.interval = 1
-            if 'every' in types:
-                i = ([t.type_ for t in tokens]).index('every')
-                del tokens[i]
-
-            index = 0
-            while index < len(tokens):
-                if tokens[index].type_ == 'number':
-                    # we assume a bare number always specifies the interval
-                    n = get_number(tokens[index].text)
-                    if n is not None:
-                        self.interval = n
-                elif tokens[index].type_ == 'unit':
-                    text = tokens[index].text
-                    if text == 'day' or text == 'week': # Day or week of month/year
-                        got_some = False
-                        while True:
-                            if index + 1 < len(tokens) and tokens[index + 1].type_ == 'number':
-                                index += 1
-                                got_some = True
-                                n = get_number(tokens[index].text)
-                                if n is not None:
-                                    if text == 'day':
-                                        if self.freq == 'monthly' or (self.freq == 'yearly' and self.bymonth):
-                                            self.bymonthday.append(str(n))
-                                        else:
-                                            self.byyearday.append(str(n))
-                                            self.freq = 'yearly'
-                                    else:
-                                        self.byweekno.append(str(n))
-                                        self.freq = 'yearly'
-                                if index >= len(tokens): break
-                            else:
-                                break
-                        if got_some:
-                            index += 1
-                            continue
-                    # we assume a bare unit (grow up...) always specifies the frequency
-                    if tokens[index].text != 'day' or \
-                      (self.freq != 'weekly' and self.freq != 'monthly' and self.freq != 'yearly'):   # Issue #18: Handle every year on the 40th day; every month on the 20th day
-                        self.freq = get_unit_freq(tokens[index].text)
-                elif tokens[index].type_ == 'recurring_unit':   # weekly, monthly, yearly
-                    self.freq = tokens[index].text
-                elif tokens[index].type_ == 'ordinal':
-                    ords = [get_ordinal_index(tokens[index].text)]
-
-                    # grab all iterated ordinals (e.g. 1st, 3rd and 4th of
-                    # november)
-                    while index + 1 < len(tokens) and tokens[index + 1].type_ == 'ordinal':
-                        ords.append(get_ordinal_index(tokens[index + 1].text))
-                        index += 1
-
-                    if index + 2 < len(tokens) and tokens[index + 1].type_ == 'unit' and \
-                            tokens[index + 1].text == 'day' and tokens[index + 2].type_ == 'unit':  # Issue #18
-                        index += 1      # Issue #18: Handle "first day of month" or "last day of month"
-
-                    if index + 1 < len(tokens) and (tokens[index + 1].type_ == 'DoW' or tokens[index + 1].type_ == 'plural_weekday'):
-                        # "first wednesday of/in ..."
-                        dow = get_DoW(tokens[index + 1].text)[0]
-                        self.ordinal_weekdays.extend( ['%s%s' % (i, dow) for i in ords] )
-                        index += 1
-                        if index >= len(tokens): break
-                        index += 1
-                        continue
-                    elif index + 1 < len(tokens) and  tokens[index + 1].type_ == 'number':
-                        # e.g. the 4th of every 3 months
-                        n = get_number(tokens[index + 1].text)
-                        if n is not None:
-                            self.interval = n
-                        index += 1
-                    if index + 1 < len(tokens) and tokens[index + 1].type_ == 'unit' and \
-                      tokens[index + 1].text == 'day' and \
-                      (self.freq == 'monthly' or self.freq == 'yearly' or self.freq == 'weekly'):
-                        index += 1                      # Issue #18: Handle every year on the 4th day
-                    if index + 1 < len(tokens) and tokens[index + 1].type_ == 'unit':
-                        # "first of the month/year"
-                        self.freq = get_unit_freq(tokens[index + 1].text)
-                        if self.freq == 'monthly':
-                            self.bymonthday.extend([str(i) for i in ords])
-                        elif self.freq == 'yearly':
-                            self.byyearday.extend([str(i) for i in ords])
-                        elif self.freq == 'weekly':
-                            self.weekdays.extend([ordered_weekday_codes[i%8] for i in ords])
-                        index += 1
-                        if index >= len(tokens): break
-                    elif index + 1 < len(tokens) and tokens[index + 1].type_ == 'MoY':    # 2nd of Mar
-                        if not self.freq:
-                            self.freq = 'yearly'
-                        self.bymonth.append(str(get_MoY(tokens[index + 1].text)))
-                        self.bymonthday.extend([str(i) for i in ords])
-                        index += 1
-                    elif index + 1 < len(tokens) and tokens[index + 1].type_ == 'instances':    # 3rd instance of ...
-                        self.bysetpos.extend([str(i) for i in ords])
-                        index += 1
-                    elif self.freq is not None:     # Already have the freq, e.g. every month on the 4th
-                        if self.freq == 'monthly':
-                            self.bymonthday.extend([str(i) for i in ords])
-                        elif self.freq == 'yearly':
-                            self.byyearday.extend([str(i) for i in ords])
-                        elif self.freq == 'weekly':
-                            self.weekdays.extend([ordered_weekday_codes[i%8] for i in ords])
-                    elif len(ords) == 1 and ords[0] == 2:   # Issue #16: 'second' is ambiguous - treat here as unit
-                        self.freq = 'secondly'              # Issue #16
-                elif tokens[index].type_ == 'DoW' or tokens[index].type_ == 'plural_weekday':
-                    # if we have a day of week, we can assume the frequency is
-                    # weekly if it hasnt been set yet.
-                    if not self.freq:
-                        self.freq = 'weekly'
-                    self.weekdays.extend(get_DoW(tokens[index].text))
-                elif tokens[index].type_ == 'MoY':
-                    # if we have a month we assume frequency is yearly
-                    # if it hasnt been set.
-                    if not self.freq:
-                        self.freq = 'yearly'
-                    self.bymonth.append(str(get_MoY(tokens[index].text)))
-                    while True:
-                        if index + 1 < len(tokens) and tokens[index + 1].type_ == 'ordinal':    # Aug 1st
-                            self.bymonthday.append(str(get_ordinal_index(tokens[index + 1].text)))
-                            index += 1
-                            if index >= len(tokens): break
-                        elif index + 1 < len(tokens) and tokens[index + 1].type_ == 'number':   # Issue #15: Aug 30
-                            index += 1
-                            n = get_number(tokens[index].text)
-                            if n is not None:
-                                self.bymonthday.append(str(n))
-                            if index >= len(tokens): break
-                        else:
-                            break
-                index += 1
+            self.interval = 2 if 'every other' in s else 1
+            # Each handler interprets the token at i and whatever follows it that belongs to it, and
+            # returns the index of the next token to interpret
+            handlers = self.EVENT_HANDLERS
+            i = 0
+            n = len(content)
+            while i < n:
+                handler = handlers.get(content[i].type_)
+                i = handler(self, content, i) if handler else i + 1
             return True
         # No recurring match, return false
         return False
 
+    def _event_number(self, tokens, i):
+        # we assume a bare number always specifies the interval
+        self.interval = get_number(tokens[i].text)
+        return i + 1
+
+    def _event_unit(self, tokens, i):
+        text = tokens[i].text
+        if text == 'day' or text == 'week':     # Day or week of month/year, e.g. every year on day 40
+            j = i + 1
+            while j < len(tokens) and tokens[j].type_ == 'number':
+                n = get_number(tokens[j].text)
+                if text == 'day':
+                    if self.freq == 'monthly' or (self.freq == 'yearly' and self.bymonth):
+                        self.bymonthday.append(str(n))
+                    else:
+                        self.byyearday.append(str(n))
+                        self.freq = 'yearly'
+                else:
+                    self.byweekno.append(str(n))
+                    self.freq = 'yearly'
+                j += 1
+            if j > i + 1:
+                return j
+        # we assume a bare unit (grow up...) always specifies the frequency
+        if text != 'day' or (self.freq != 'weekly' and self.freq != 'monthly' and self.freq != 'yearly'):   # Issue #18: Handle every year on the 40th day; every month on the 20th day
+            self.freq = get_unit_freq(text)
+        return i + 1
+
+    def _event_recurring_unit(self, tokens, i):     # weekly, monthly, yearly
+        self.freq = tokens[i].text
+        return i + 1
+
+    def _event_DoW(self, tokens, i):
+        # if we have a day of week, we can assume the frequency is
+        # weekly if it hasnt been set yet.
+        if not self.freq:
+            self.freq = 'weekly'
+        self.weekdays.extend(get_DoW(tokens[i].text))
+        return i + 1
+
+    def _event_MoY(self, tokens, i):
+        # if we have a month we assume frequency is yearly
+        # if it hasnt been set.
+        if not self.freq:
+            self.freq = 'yearly'
+        self.bymonth.append(str(get_MoY(tokens[i].text)))
+        i += 1
+        while i < len(tokens):
+            if tokens[i].type_ == 'ordinal':        # Aug 1st
+                self.bymonthday.append(str(get_ordinal_index(tokens[i].text)))
+            elif tokens[i].type_ == 'number':       # Issue #15: Aug 30
+                self.bymonthday.append(str(get_number(tokens[i].text)))
+            else:
+                break
+            i += 1
+        return i
+
+    def _event_ordinal(self, tokens, i):
+        # grab all iterated ordinals (e.g. 1st, 3rd and 4th of november)
+        ords = [get_ordinal_index(tokens[i].text)]
+        n = len(tokens)
+        while i + 1 < n and tokens[i + 1].type_ == 'ordinal':
+            i += 1
+            ords.append(get_ordinal_index(tokens[i].text))
+        if i + 2 < n and tokens[i + 1].type_ == 'unit' and tokens[i + 1].text == 'day' and tokens[i + 2].type_ == 'unit':  # Issue #18
+            i += 1      # Issue #18: Handle "first day of month" or "last day of month"
+        if i + 1 < n and (tokens[i + 1].type_ == 'DoW' or tokens[i + 1].type_ == 'plural_weekday'):
+            # "first wednesday of/in ..."
+            dow = get_DoW(tokens[i + 1].text)[0]
+            self.ordinal_weekdays.extend(['%s%s' % (o, dow) for o in ords])
+            return i + 2
+        if i + 1 < n and tokens[i + 1].type_ == 'number':
+            # e.g. the 4th of every 3 months
+            i += 1
+            self.interval = get_number(tokens[i].text)
+        if i + 1 < n and tokens[i + 1].type_ == 'unit' and tokens[i + 1].text == 'day' and \
+                (self.freq == 'monthly' or self.freq == 'yearly' or self.freq == 'weekly'):
+            i += 1                      # Issue #18: Handle every year on the 4th day
+        handler = self.ORDINAL_HANDLERS.get(tokens[i + 1].type_) if i + 1 < n else None
+        if handler:
+            handler(self, tokens[i + 1], ords)
+            return i + 2
+        if self.freq is not None:       # Already have the freq, e.g. every month on the 4th
+            self._by_ordinals(ords)
+        elif len(ords) == 1 and ords[0] == 2:   # Issue #16: 'second' is ambiguous - treat here as unit
+            self.freq = 'secondly'              # Issue #16
+        return i + 1
+
+    def _by_ordinals(self, ords):
+        if self.freq == 'monthly':
+            self.bymonthday.extend([str(o) for o in ords])
+        elif self.freq == 'yearly':
+            self.byyearday.extend([str(o) for o in ords])
+        elif self.freq == 'weekly':
+            self.weekdays.extend([ordered_weekday_codes[o%8] for o in ords])
+
+    def _ordinals_of_unit(self, token, ords):
+        # "first of the month/year"
+        self.freq = get_unit_freq(token.text)
+        self._by_ordinals(ords)
+
+    def _ordinals_of_MoY(self, token, ords):      # 2nd of Mar
+        if not self.freq:
+            self.freq = 'yearly'
+        self.bymonth.append(str(get_MoY(token.text)))
+        self.bymonthday.extend([str(o) for o in ords])
+
+    def _ordinals_of_instances(self, token, ords):    # 3rd instance of ...
+        self.bysetpos.extend([str(o) for o in ords])
+
+    # How parse_event interprets the recurring phrases: a handler for each type of token that can start
+    # a component, and for each type of token that can follow a run of ordinals.  Types without a
+    # handler are skipped.
+    EVENT_HANDLERS = {
+            'number': _event_number,
+            'unit': _event_unit,
+            'recurring_unit': _event_recurring_unit,
+            'ordinal': _event_ordinal,
+            'DoW': _event_DoW,
+            'plural_weekday': _event_DoW,
+            'MoY': _event_MoY,
+            }
+    ORDINAL_HANDLERS = {
+            'unit': _ordinals_of_unit,
+            'MoY': _ordinals_of_MoY,
+            'instances': _ordinals_of_instances,
+            }
+
     def parse_singleton(self, s):
         """Handle singleton dates like "first monday in Aug" or "40th day in 2010" """
+        tokens = self._tokens(s)
+        tokens = self.handle_Nth_to_the_last(tokens)        # Issue #18
+        tokens = [t for t in tokens if t.type_ in Tokenizer.CONTENT_TYPE_NAMES]
+        if len(tokens) < 2 or len(tokens) > 5:
+            return None
+        if tokens[0].type_ != 'ordinal':
+            return None
+        if tokens[1].type_ == 'ordinal':
+            return None             # e.g. "2nd and 4th"
         try:
-            tokens = Tokenizer(s)
-            tokens = self.handle_Nth_to_the_last(tokens)        # Issue #18
-            tokens = [t for t in tokens if t.type_ in [x[0] for x in Tokenizer.CONTENT_TYPES] ]
-            if not tokens:
-                return None
-            if len(tokens) < 2 or len(tokens) > 5:
-                return None
-            if tokens[0].type_ != 'ordinal':
+            n = get_ordinal_index(tokens[0].text)   # Issue #18: "-2nd" is the 2nd last
+        except ValueError:
+            self.counters.add('parse_singleton_errors')
+            return None
+        now_date = self.now_date
+        if tokens[-1].type_ == 'number':      # year, or it could be the time
+            yr = get_number(tokens[-1].text)
+            if yr >= 1000:
+                now_date = datetime.datetime(yr, 1, 1)
+            del tokens[-1]
+        month = weekday = None
+        last = tokens[-1]
+        if last.type_ == 'MoY':       # First Mon in Aug
+            if len(tokens) == 3 and tokens[1].type_ == 'DoW':
+                weekday = tokens[1].text
+            elif len(tokens) != 2:
                 return None
-            if tokens[1].type_ == 'ordinal':
-                return None             # e.g. "2nd and 4th"
-            now_date = self.now_date
-            if tokens[-1].type_ == 'number':      # year, or it could be the time
-                yr = get_number(tokens[-1].text)
-                if yr >= 1000:
-                    now_date = datetime.datetime(yr, 1, 1)
-                del tokens[-1]
-            if tokens[-1].type_ == 'MoY':       # First Mon in Aug
-                if (tokens[-2].type_ != 'ordinal' and tokens[-2].type_ != 'DoW') or len(tokens) > 4:
+            freq = 'yearly'
+            month = get_MoY(last.text)
+        elif last.type_ == 'unit' and last.text != 'day':    # first of the year
+            freq = get_unit_freq(last.text)
+            if len(tokens) == 3:
+                if tokens[1].type_ == 'DoW' or tokens[1].type_ == 'plural_weekday':   # first mon of the month
+                    weekday = tokens[1].text
+                elif tokens[1].text != 'day':   # Issue #18: first day of the month
                     return None
-                s = ' '.join(t.text for t in tokens)
-            elif tokens[-1].type_ == 'unit' and tokens[-1].text != 'day':    # first of the year
-                if len(tokens) > 4:
-                    return None
-                units = tokens[-1].text
-                s = ' '.join(t.text for t in tokens[:-1])
-                s += ' of the ' + units     # We do this so "every first year" doesn't get changed to "every 1 years"
-            elif tokens[-1].text == 'day':      # 40th day in 2010
-                if len(tokens) >= 3:
+            elif len(tokens) != 2:
+                return None
+        elif last.text == 'day' and len(tokens) == 2:      # 40th day in 2010
+            freq = 'yearly'
+        else:
+            return None
+        if weekday is not None:
+            weekday = weekday_codes.index(get_DoW(weekday)[0])
+        if freq == 'weekly':        # The nth day of the week, from Sunday, or the given weekday
+            if weekday is None:
+                code = ordered_weekday_codes[n % 8]
+                if not code:
                     return None
-                s = f'{tokens[0].text} of the year'
-            else:
+                weekday = weekday_codes.index(code)
+            day = now_date.date() + datetime.timedelta(days=(weekday - now_date.weekday()) % 7)
+        elif freq == 'monthly' or freq == 'yearly':
+            day = self.next_nth_day(now_date.date(), n, weekday, month, freq == 'monthly')
+            if day is None:
                 return None
+        else:
+            return None
+        return now_date.replace(year=day.year, month=day.month, day=day.day)
 
-            s = re.sub(r'[-]([a-z0-9]+)', r'\1 last', s)        # Issue #18: change "-2nd" back to "2nd last"
-
-            r = RecurringEvent(now_date=now_date, preferred_time_range=self.preferred_time_range)
-            rfc = r.parse(f'every {s}')
-            if not rfc:
-                return None     # pragma nocover
-            from dateutil.rrule import rrulestr
-            rr = rrulestr(rfc, dtstart=now_date)
-            return rr[0]
-        except Exception as e:      # pragma nocover
-            log.debug(f'parse_singleton({s}): Exception {e}')
+    @staticmethod
+    def nth_day(first, last, n, weekday=None):
+        """Return the nth day (counting back from the end if n is negative) from date `first` to date
+        `last` inclusive that falls on `weekday` (0 for Monday, or any day if None), or None if there's
+        no such day"""
+        if n == 0:
+            return None
+        if weekday is None:
+            day = first + datetime.timedelta(days=n - 1) if n > 0 else last + datetime.timedelta(days=n + 1)
+        elif n > 0:
+            day = first + datetime.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+        else:
+            day = last - datetime.timedelta(days=(last.weekday() - weekday) % 7 + 7 * (-n - 1))
+        if day < first or day > last:
+            return None
+        return day
 
-        return None                 # pragma nocover
+    @staticmethod
+    def next_nth_day(start, n, weekday=None, month=None, monthly=False):
+        """Return the first date on or after `start` that's the nth_day of its month if `monthly`,
+        otherwise of `month` or of the year, looking as far ahead as the calendar repeats (400
+        years), or None if there's no such date"""
+        year, mon = start.year, start.month
+        for _ in range(400 * 12 if monthly else 400):
+            if year > datetime.MAXYEAR:
+                break
+            if monthly:
+                first = datetime.date(year, mon, 1)
+                last = datetime.date(year, mon, calendar.monthrange(year, mon)[1])
+                year, mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+            elif month is not None:
+                first = datetime.date(year, month, 1)
+                last = datetime.date(year, month, calendar.monthrange(year, month)[1])
+                year += 1
+            else:
+                first = datetime.date(year, 1, 1)
+                last = datetime.date(year, 12, 31)
+                year += 1
+            if last < start:
+                continue
+            day = RecurringEvent.nth_day(first, last, n, weekday)
+            if day is not None and day >= start:
+                return day
+        return None
 
     def get_hour(self, hr, mod):
         hr = int(hr)
@@ -839,8 +2070,11 @@ class RecurringEvent(object):
         return hr
 
 
-    def format(self, rrule_or_datetime):
-        """Convert a rrule, rrulestr, or datetime back to the appropriate English representation"""
+    def format(self, rrule_or_datetime, timeout=None):
+        """Convert a rrule, rrulestr, or datetime back to the appropriate English representation.
+        With a timeout (in seconds), returns TIMED_OUT if that takes longer."""
+        if timeout is not None:
+            return call_with_timeout(timeout, self.format, rrule_or_datetime)
         if rrule_or_datetime is None:
             return None
         if isinstance(rrule_or_datetime, datetime.date):    # date or datetime
@@ -899,7 +2133,7 @@ class RecurringEvent(object):
                 elif len(bd) == 2:
                     return day_names[bd]
             except Exception as e:
-                log.debug(f'byday_name({bd}): Exception {e}')
+                log.debug('byday_name(%s): Exception %s', bd, e)
                 raise
             return bd       # pragma nocover
 
@@ -907,9 +2141,8 @@ class RecurringEvent(object):
             """Change 1st Fri and 2nd Fri and 3rd Fri => 1st and 2nd and 3rd Fri"""
             if s is None:
                 return s    # pragma nocover
-            re_squasher = re.compile(r'((?:\d.. to the )?last|\d..)\s(Mon|Tue|Wed|Thu|Fri|Sat|Sun) and ((?:\d.. to the )?last|\d..)\s\2')
             while True:
-                t = re.sub(re_squasher, r'\1 and \3 \2', s)
+                t = RE_SQUASHER.sub(r'\1 and \3 \2', s)
                 if t == s:
                     return t
                 s = t
@@ -935,7 +2168,7 @@ class RecurringEvent(object):
                 elif v[0].isdigit() and len(v) == 8:
                     return datetime.datetime.strptime(v, '%Y%m%d').date()
             except Exception as e:
-                log.debug(f'todatetime({v}): Exception {e}')
+                log.debug('todatetime(%s): Exception %s', v, e)
                 pass
             return v
 
@@ -944,7 +2177,7 @@ class RecurringEvent(object):
                 result = join_str.join(map(func, lst))
             else:
                 result = func(lst)
-            log.debug(f'list_handler({func.__name__}, {lst}, {join_str}) = {result}')
+            log.debug('list_handler(%s, %s, %s) = %s', func.__name__, lst, join_str, result)
             return result
 
         def month_name(n):
@@ -994,7 +2227,7 @@ class RecurringEvent(object):
                     else:
                         vls = todatetime(toint(vls))
                 result[name] = vls
-            log.debug(f'parse_rrule({r}) = {result}')
+            log.debug('parse_rrule(%s) = %s', r, result)
             return result
 
         result = ''
@@ -1045,13 +2278,17 @@ class RecurringEvent(object):
                 def starting_needed():
                     """Make sure we really need this 'starting' by seeing what happens if we remove it"""
                     try:
-                        from dateutil.rrule import rrulestr
+                        self.counters.add('rrulestr_starting_needed', 2)
                         r1 = rrulestr(rrule_or_datetime, dtstart=self.now_date)
-                        r2 = rrulestr(re.sub(r'^DTSTART.*?\n', '', rrule_or_datetime, re.M), dtstart=self.now_date)
-                        if r1[0] == r2[0]:
+                        r2 = rrulestr(RE_DTSTART_LINE.sub('', rrule_or_datetime), dtstart=self.now_date)
+                        first = r1[0]
+                        check_deadline()
+                        if first == r2[0]:
                             return False
+                    except DeadlineExceeded:
+                        raise
                     except Exception:       # pragma nocover
-                        pass
+                        self.counters.add('starting_needed_errors')
                     return True
 
                 if start is not None and start != now and start != adj_now and starting_needed():
@@ -1079,9 +2316,10 @@ class RecurringEvent(object):
                     months.add((e.year, e.month))
                     max_year = max(max_year, e.year)
                 try:
-                    from dateutil.rrule import rrulestr
+                    self.counters.add('rrulestr_squash_except_months')
                     rr = rrulestr(rrule_or_datetime, dtstart=self.now_date)
                     for r in rr:
+                        check_deadline()
                         if r.year > max_year:
                             break
                         if (r.year, r.month) in months: # Not excluded
@@ -1089,7 +2327,10 @@ class RecurringEvent(object):
                     months = list(months)
                     months.sort()
                     return [month_name(d[1]) + ((' ' + str(d[0])) if d[0] != self.now_date.year else '') for d in months]
+                except DeadlineExceeded:
+                    raise
                 except Exception:       # pragma nocover
+                    self.counters.add('squash_except_months_errors')
                     return None
 
             def add_excepts(pr):
@@ -1188,8 +2429,7 @@ class RecurringEvent(object):
                             list_handler(byday_name, byday).replace('Sat and Sun', 'weekend'). \
                             replace('Mon and Tue and Wed and Thu and Fri', 'weekday') + add_suffix(pr)
                     result = result.replace('every week on ', 'every ')
-                    result = re.sub(r'^every weekend$', 'weekends', result)
-                    result = re.sub(r'^every weekday$', 'weekdays', result)
+                    result = SHORT_BYDAY_NAMES.get(result, result)
                     return result
 
             elif fr in ('DAILY', 'HOURLY', 'MINUTELY', 'SECONDLY'):
@@ -1200,9 +2440,79 @@ class RecurringEvent(object):
                 """
                 return every_fr_interval_name(fr, interval) + add_bysetpos(rr) + add_suffix(pr)
             else: 
-                log.debug(f'format({rrule_or_datetime}): Case not handled!')
+                self.counters.add('format_unhandled')
+                log.debug('format(%s): Case not handled!', rrule_or_datetime)
+        except DeadlineExceeded:
+            raise
         except Exception as e:
-            log.debug(f'format({rrule_or_datetime}): Exception {e}')
+            self.counters.add('format_errors')
+            log.debug('format(%s): Exception %s', rrule_or_datetime, e)
             #traceback.print_exc()
 
         return rrule_or_datetime
+
+# Time spent in each stage of parsing and formatting; off by default.  Turn it on with
+# `with RecurringEvent.stage_times:` or RecurringEvent.stage_times.enable(), read it with info() and
+# reset it with clear().
+RecurringEvent.stage_times = StageTimer(dict(
+        normalize=(sys.modules[__name__], 'normalize'),
+        segment=(sys.modules[__name__], 'segment'),
+        parse_event=(RecurringEvent, 'parse_event'),
+        apply_clauses=(RecurringEvent, 'apply_clauses'),
+        parse_date=(RecurringEvent, 'parse_date'),
+        parse_singleton=(RecurringEvent, 'parse_singleton'),
+        parsedatetime=(RecurringEvent, 'parse_with_pdt'),
+        parse_time=(RecurringEvent, 'parse_time'),
+        adjust_exdates=(RecurringEvent, 'adjust_exdates'),
+        format=(RecurringEvent, 'format'),
+        ))
+
+# How often parses take their shortcuts (too_long, prefilter, canonical), how many workers they
+# build, how often they fall back to parsedatetime (or skip it, parsedatetime_skipped), how many
+# rrulestr rules adjust_exdates and format build (rrulestr_<where>), how often exceptions are swallowed
+# (<where>_errors) or format gives up (format_unhandled), and timeouts; plus the caches' hit rates.
+# Read them with RecurringEvent.counters.info() and reset them with clear().
+RecurringEvent.counters = Counters(dict(
+        date_cache=RecurringEvent.date_cache,
+        result_cache=RecurringEvent.result_cache,
+        template_cache=RecurringEvent.template_cache,
+        tokenizer=Tokenizer.cache,
+        ))
+
+# Phrases so common that parse() returns their precomputed results, alone or followed by "at <time>"
+# (whose hour still honours preferred_time_range).  Only for RecurringEvent itself, since a subclass
+# could parse them differently, and only for phrases that don't depend on the reference date.
+CANONICAL_PHRASES = ('daily', 'weekly', 'monthly', 'yearly', 'everyday', 'every day', 'every week',
+        'every month', 'every year', 'every other day', 'every other week', 'every other month',
+        'every other year', 'weekdays', 'weekends', 'on weekdays', 'on weekends', 'every weekday',
+        'every weekend') + tuple(phrase % day for phrase in ('%ss', 'every %s',
+        'every other %s', 'on %ss') for day in ('monday', 'tuesday', 'wednesday', 'thursday', 'friday',
+        'saturday', 'sunday'))
+_canonical_results = None
+
+def canonical_results():
+    """CANONICAL_PHRASES' ParseResults, computed on first use"""
+    global _canonical_results
+    if _canonical_results is None:
+        results = {}
+        parser = RecurringEvent(datetime.datetime(2000, 1, 1))
+        for phrase in CANONICAL_PHRASES:
+            worker = parser._worker()
+            worker._now_used = now_used = [False]
+            result = ParseResult.from_event(worker, worker._parse(phrase))
+            if result.is_recurring and not now_used[0]:
+                results[phrase] = result
+        _canonical_results = results
+    return _canonical_results
+
+_no_date_result = None
+
+def no_date_result():
+    """The ParseResult of text that isn't a date"""
+    global _no_date_result
+    if _no_date_result is None:
+        event = object.__new__(RecurringEvent)
+        event._reset()
+        event.is_recurring = False
+        _no_date_result = ParseResult.from_event(event, None)
+    return _no_date_result
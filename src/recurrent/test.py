@@ -1,8 +1,21 @@
+import os
+import re
+import gc
+import sys
+import weakref
+import random
 import unittest
+import subprocess
 import datetime
+import threading
 from dateutil import rrule
+import parsedatetime
 
-from recurrent.event_parser import RecurringEvent
+from recurrent.event_parser import RecurringEvent, ParseResult, Tokenizer, TokenStream, get_calendar, get_constants
+from recurrent.event_parser import normalize, handle_begin_end, segment, Clauses, PHRASE_REWRITER, template_of
+from recurrent.event_parser import canonical_results, CANONICAL_PHRASES, may_be_date, locale_words
+from recurrent.event_parser import TIMED_OUT, call_with_timeout, MAX_CALENDARS, RE_LONG_DATE_START, RE_RRULE, RE_DOW
+import recurrent
 from recurrent import parse as rparse
 from recurrent import format as rformat
 
@@ -489,6 +502,595 @@ class ParseTest(unittest.TestCase):
     def test_high_level(self):
         self.assertEqual(rformat(rparse('daily')), 'daily')
 
+    def test_pooled_parsers(self):
+        self.assertEqual(rparse('next tuesday', NOW), datetime.datetime(2010, 1, 5, 9))
+        self.assertEqual(rparse('tomorrow', datetime.date(2010, 2, 1)), datetime.datetime(2010, 2, 2, 9))
+        self.assertEqual(rformat(rparse('every day starting next tuesday until feb', NOW), NOW),
+                         'daily from Tue Jan 5, 2010 to Mon Feb 1, 2010')
+        self.assertEqual(rparse('at 3', NOW, preferred_time_range=(1, 12)), NOW.replace(hour=3))
+        self.assertEqual(rparse('at 3', NOW), NOW.replace(hour=15))
+        self.assertIs(recurrent._get_parser(NOW, (8, 19), None), recurrent._get_parser(None, [8, 19], None))
+        # Parsers for constants passed in once are dropped
+        consts = parsedatetime.Constants(localeID='en_US', usePyICU=False)
+        consts.use24 = False
+        parser = weakref.ref(recurrent._get_parser(NOW, (8, 19), consts))
+        del consts
+        for hour in range(recurrent.MAX_PARSERS):
+            rparse('tomorrow', NOW, preferred_time_range=(hour, 19))
+        gc.collect()
+        self.assertIsNone(parser())
+        results = {}
+        def worker(n):
+            now = datetime.datetime(2010, 1, n)
+            results[n] = [rparse('tomorrow', now) for _ in range(50)]
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(1, 9)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for n, got in results.items():
+            self.assertEqual(set(got), {datetime.datetime(2010, 1, n + 1, 9)})
+
+    def test_parse_result(self):
+        date = RecurringEvent(NOW)
+        res = date.parse_result('every day starting feb 2 except on feb 5')
+        self.assertIsInstance(res, ParseResult)
+        self.assertTrue(res.is_recurring)
+        self.assertIsNone(res.datetime)
+        self.assertEqual(res.rfc, 'DTSTART:20100202\nRRULE:INTERVAL=1;FREQ=DAILY\nEXDATE:20100205T000000')
+        self.assertEqual(res.value, res.rfc)
+        self.assertEqual(res.get_params(), dict(dtstart='20100202', freq='daily', interval=1,
+            exdate=[datetime.date(2010, 2, 5)]))
+        self.assertFalse(hasattr(date, 'is_recurring'))     # The parser itself is untouched
+        self.assertIsNone(date.freq)
+        self.assertEqual(res, date.parse_result('every day starting feb 2 except on feb 5'))
+        self.assertEqual(len({res, date.parse_result('every day starting feb 2 except on feb 5')}), 1)
+        with self.assertRaises(AttributeError):
+            res.rfc = None
+        res = date.parse_result('feb 2nd')
+        self.assertEqual((res.value, res.datetime, res.rfc, res.is_recurring),
+                (datetime.datetime(2010, 2, 2), datetime.datetime(2010, 2, 2), None, False))
+        self.assertIsNone(date.parse_result('not a date at all').value)
+
+    def test_parse_result_shared_across_threads(self):
+        date = RecurringEvent(NOW)
+        phrases = ['every other friday', 'daily until feb', 'feb 2nd', 'weekdays at 9am', '1st fri in feb']
+        expected = dict((s, RecurringEvent(NOW).parse(s)) for s in phrases)
+        errors = []
+        def worker():
+            for _ in range(20):
+                for s in phrases:
+                    if date.parse_result(s).value != expected[s]:
+                        errors.append(s)    # pragma nocover
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+
+    def test_token_classifier(self):
+        def cascade(word):
+            for type_, regex in Tokenizer.TYPES:
+                if regex.match(word):
+                    return type_
+            return None
+        words = set(classifier_corpus())
+        words.update(['2nd', '22nd', 'second', 'seconds', 'secs', 'mins', 'min', '10:30', '10:30pm', "10o'clock",
+            '3p', '12a', 'restarting', 'starts', 'ending', 'untilx', 'weekday', 'weekdays', 'wednsday', 'thurs',
+            'thu', 'septembers', 'sept', 'mayor', 'x', '', 'o', 'am', 'pm', 'bi', 'repeats', 'onward', 'the1st'])
+        for word in words:
+            self.assertEqual(Tokenizer.classify(word), cascade(word), word)
+        for word in words:      # Again, from the cache
+            self.assertEqual(Tokenizer.classify(word), cascade(word), word)
+
+    def test_classifier_cache(self):
+        cache = Tokenizer.cache
+        maxsize = cache.maxsize
+        try:
+            cache.clear()
+            Tokenizer('every tuesday at 3pm every tuesday')
+            self.assertEqual(cache.info(), dict(hits=2, misses=4, size=4, maxsize=maxsize))
+            cache.resize(2)
+            self.assertEqual(len(cache), 2)
+            self.assertEqual(Tokenizer.classify('tuesday'), 'DoW')     # Most recently used survive
+            self.assertEqual(cache.hits, 3)
+            self.assertEqual(Tokenizer.classify('3pm'), 'time')
+            self.assertEqual(cache.misses, 5)
+            cache.resize(0)
+            self.assertEqual(Tokenizer.classify('every'), 'every')
+            self.assertEqual(len(cache), 0)
+        finally:
+            cache.resize(maxsize)
+
+    def test_token_stream(self):
+        text = 'meet  every 2nd tue at 3pm soon'
+        stream = TokenStream(text)
+        self.assertEqual(len(stream), 7)
+        self.assertEqual([stream.word(i) for i in range(len(stream))], text.split())
+        self.assertEqual(stream.span(1), (6, 11))
+        self.assertEqual([stream.type_(i) for i in range(len(stream))],
+                [None, 'every', 'ordinal', 'DoW', 'sep', 'time', None])
+        tokens = Tokenizer(text)
+        self.assertEqual([(t.text, t.type_, t.start, t.end) for t in tokens],
+                [(text[t.start:t.end], stream.type_(i + 1), t.start, t.end) for i, t in enumerate(tokens)])
+        self.assertEqual([t.text for t in tokens.all_], text.split())
+        self.assertIs(tokens.all_[1], tokens[0])
+        self.assertFalse(hasattr(tokens[0], '__dict__'))
+
+    def test_token_stream_slice(self):
+        for expr in expressions[:100]:
+            text = normalize(expr[0])
+            stream = TokenStream(text)
+            for start in range(len(text) + 1):
+                for end in range(start, len(text) + 1):
+                    self.assertEqual([(t.text, t.type_) for t in stream.slice(start, end)],
+                            [(t.text, t.type_) for t in Tokenizer(text[start:end])], (text, start, end))
+
+    def test_tokenize_once(self):
+        from recurrent.benchmark import count_tokenizations
+        date = RecurringEvent(NOW)
+        for string in ('every day starting next tuesday until feb', 'every 3 fridays from november until february',
+                'daily except on June 23rd and July 4th', 'fridays starting in may for 10 occurrences', 'next tuesday'):
+            expected = date.parse(string)
+            self.assertEqual(count_tokenizations(lambda: self.assertEqual(date.parse(string), expected)), 1, string)
+
+    def test_normalize(self):
+        corpus = [expr[0] for expr in expressions] + readme_examples() + [
+            'Tuesday, January 5, 2010', 'mon,2020', 'a , , and b', ' ,x, ', "' hello '", 'daily,', ',daily',
+            'fri,\tand sat', 'x!!y', 'x ! y', 'weekends,2021!', 're.compiletue,  re.compilefeb', "it's   9 o'clock\n"]
+        rnd = random.Random(1)
+        pieces = [',', ' ', '  ', '\t', "'", '!', '.', '-', ':', '/', 'and', 'tue', 'feb', '2020', '1', 'x', 'É',
+                'sunday', 'may', 're.compile', "re.compile'", "'", 'weekend', ')', '_']
+        for _ in range(3000):
+            corpus.append(''.join(rnd.choice(pieces) for _ in range(rnd.randrange(1, 12))))
+        for string in corpus:
+            self.assertEqual(normalize(string), normalize_reference(string), repr(string))
+
+    def test_phrase_rewrites(self):
+        for stage, string, expected in (
+                ('phrase', 'at the end of the month', 'at the last of the month'),
+                ('phrase', 'every month at the beginning.', 'every month on the first.'),
+                ('phrase', 'weekend of fun', 'weekend of fun'),
+                ('event', 'every 2nd mon-wed', 'every 2 mondays and tuesdays and wednesdays'),
+                ('event', 'every fri thru sun.', 'every fri and sat and sun.'),
+                ('event', 'every 3rd week', 'every 3 weeks'),
+                ('event', 'every 3rd fri of each month', 'every 3rd fri of each month'),
+                ('event', '2nd mon-wed', '2nd mon and tue and wed'),    # No 'every', so no interval
+                ):
+            self.assertEqual(PHRASE_REWRITER.rewrite(stage, string), expected)
+
+    def test_segment(self):
+        for string, expected in (
+                ('every day starting next tuesday until feb', Clauses('every day', start='next tuesday', end='feb')),
+                ('starting may every friday for 10 occurrences', Clauses('every friday', start='may', count=10)),
+                ('every monday from jan to jun except mar 1st', Clauses('every monday', start='jan', end='jun', except_='mar 1st')),
+                ('daily for the next 2 weeks', Clauses('daily', period=(2, 'weeks'))),
+                ('daily except on weekends', Clauses('daily', except_='weekends')),
+                ('every day from the office to home', Clauses('every day', start='the office', end='home')),
+                ('', Clauses('')),
+                ):
+            self.assertEqual(segment(string), expected)
+        for string in set(handle_begin_end(normalize(expr[0])) for expr in expressions):
+            self.assertEqual(segment(string), segment_reference(string), repr(string))
+
+    def test_singleton_dates(self):
+        for now in (NOW, datetime.datetime(2011, 8, 20, 15, 30), datetime.datetime(2012, 2, 29)):
+            date = RecurringEvent(now)
+            for string, rule in (
+                    ('first mon in aug', 'FREQ=YEARLY;BYMONTH=8;BYDAY=1MO'),
+                    ('last fri in feb', 'FREQ=YEARLY;BYMONTH=2;BYDAY=-1FR'),
+                    ('2nd to the last fri of the month', 'FREQ=MONTHLY;BYDAY=-2FR'),
+                    ('5th wed of the month', 'FREQ=MONTHLY;BYDAY=5WE'),
+                    ('last day of the month', 'FREQ=MONTHLY;BYMONTHDAY=-1'),
+                    ('31st of the month', 'FREQ=MONTHLY;BYMONTHDAY=31'),
+                    ('29th of feb', 'FREQ=YEARLY;BYMONTH=2;BYMONTHDAY=29'),
+                    ('40th day', 'FREQ=YEARLY;BYYEARDAY=40'),
+                    ('366th day', 'FREQ=YEARLY;BYYEARDAY=366'),
+                    ('last of the year', 'FREQ=YEARLY;BYYEARDAY=-1'),
+                    ('3rd mon of the year', 'FREQ=YEARLY;BYDAY=3MO'),
+                    ('first of the week', 'FREQ=WEEKLY;BYDAY=SU'),
+                    ):
+                self.assertEqual(date.parse_singleton(string), rrule.rrulestr('RRULE:' + rule, dtstart=now)[0],
+                        '%s from %s' % (string, now))
+        self.assertEqual(RecurringEvent(NOW).parse_singleton('40th day in 2011'), datetime.datetime(2011, 2, 9))
+        self.assertIsNone(RecurringEvent(NOW).parse_singleton('30th of feb'))
+        self.assertIsNone(RecurringEvent(NOW).parse_singleton('2nd and 4th of the month'))
+
+    def test_except_parsed_once(self):
+        dates = []
+        class Parser(RecurringEvent):
+            def parse_date(self, date_string):
+                dates.append(date_string)
+                return super(Parser, self).parse_date(date_string)
+        date = Parser(NOW)
+        self.assertEqual(date.parse('daily except on June 23rd and July 4th'),
+                'RRULE:INTERVAL=1;FREQ=DAILY\nEXDATE:20100623T000000,20100704T000000')
+        self.assertEqual(dates, ['june 23rd', 'july 4th'])     # Not 'june 23rd and july 4th' as well
+
+    def test_date_cache(self):
+        cache = RecurringEvent.date_cache
+        cache.clear()
+        date = RecurringEvent(NOW)
+        self.assertEqual(date.parse_date('tomorrow'), datetime.datetime(2010, 1, 2, 9))
+        self.assertEqual(date.parse_date('tomorrow'), datetime.datetime(2010, 1, 2, 9))
+        self.assertEqual(date.parse_date('gibberish'), None)
+        self.assertEqual(date.parse_date('gibberish'), None)        # Failures are remembered too
+        self.assertEqual(cache.info(), dict(hits=2, misses=2, size=2, maxsize=cache.maxsize))
+        date.set_now_date(datetime.datetime(2011, 6, 1))
+        self.assertEqual(date.parse_date('tomorrow'), datetime.datetime(2011, 6, 2, 9))
+        utc = datetime.datetime(2010, 1, 1, tzinfo=datetime.timezone.utc)
+        self.assertEqual(RecurringEvent(utc).parse_date('1st fri in feb'), datetime.datetime(2010, 2, 5, tzinfo=datetime.timezone.utc))
+        self.assertEqual(RecurringEvent(NOW).parse_date('1st fri in feb'), datetime.datetime(2010, 2, 5))
+        consts = parsedatetime.Constants(localeID='en_US', usePyICU=False)
+        consts.use24 = False
+        RecurringEvent(NOW, parse_constants=consts).parse_date('tomorrow')
+        self.assertEqual(cache.misses, 6)                           # Other constants, other entry
+        class PaydayEvent(RecurringEvent):
+            def parse_singleton(self, s):
+                if s == 'payday':
+                    return datetime.datetime(2010, 1, 15)
+                return super(PaydayEvent, self).parse_singleton(s)
+        self.assertEqual(RecurringEvent(NOW).parse('daily starting payday'), 'RRULE:INTERVAL=1;FREQ=DAILY')
+        self.assertEqual(PaydayEvent(NOW).parse('daily starting payday'),       # Other class, other entry
+                'DTSTART:20100115\nRRULE:INTERVAL=1;FREQ=DAILY')
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_result_cache(self):
+        cache = RecurringEvent.result_cache
+        maxsize = cache.maxsize
+        try:
+            cache.resize(100)
+            cache.clear()
+            date = RecurringEvent(NOW)
+            self.assertEqual(date.parse('Tuesdays and Thursdays'), 'RRULE:BYDAY=TU,TH;INTERVAL=1;FREQ=WEEKLY')
+            date.weekdays.append('WE')                          # The cached result is not shared
+            later = RecurringEvent(datetime.datetime(2012, 3, 1))
+            self.assertEqual(later.parse('tuesdays and thursdays'), 'RRULE:BYDAY=TU,TH;INTERVAL=1;FREQ=WEEKLY')
+            self.assertEqual(later.weekdays, ['TU', 'TH'])
+            self.assertEqual((cache.hits, cache.misses), (1, 1))  # This does not depend on the date
+            self.assertEqual(date.parse('daily until next month'), 'RRULE:INTERVAL=1;FREQ=DAILY;UNTIL=20100201')
+            self.assertEqual(later.parse('daily until next month'), 'RRULE:INTERVAL=1;FREQ=DAILY;UNTIL=20120401')
+            self.assertEqual(recurrent.parse('daily until next month', NOW), 'RRULE:INTERVAL=1;FREQ=DAILY;UNTIL=20100201')
+            self.assertEqual((cache.hits, cache.misses), (2, 3))
+            cache.resize(2)
+            self.assertEqual(len(cache), 2)
+        finally:
+            cache.resize(maxsize)
+
+    def test_compile(self):
+        date = RecurringEvent(NOW)
+        for s in ('tuesdays at 9am', 'daily for the next 2 weeks', 'every other friday starting next month',
+                'daily except on dec 25th and jan 1', 'daily except every monday', 'next tuesday', 'blah'):
+            date._now_used[0] = False
+            plan = date.compile(s)
+            self.assertFalse(date._now_used[0])                  # Compiling never looks at the date
+            for now in (NOW, datetime.datetime(2013, 7, 19, 15, 30), datetime.datetime(2020, 2, 29)):
+                self.assertEqual(plan.bind(now), RecurringEvent(now).parse(s))
+        plan = date.compile('daily until next month')
+        self.assertEqual(plan.bind(NOW), 'RRULE:INTERVAL=1;FREQ=DAILY;UNTIL=20100201')
+        self.assertEqual(plan.bind(datetime.datetime(2012, 3, 1)), 'RRULE:INTERVAL=1;FREQ=DAILY;UNTIL=20120401')
+        with self.assertRaises(AttributeError):
+            plan.text = 'weekly'
+
+    def test_templates(self):
+        self.assertEqual(template_of('every 3 days'), (('every', '<number1>', 'days'), ['3']))
+        self.assertEqual(template_of('every 3rd and 1st monday'),
+                (('every', '<ordinal1>', 'and', '<ordinal1>', '<DoW>'), ['3rd', '1st', 'monday']))
+        self.assertEqual(template_of('daily at 3'), None)           # A time, whose value matters
+        self.assertEqual(template_of('mondays and fridays'), None)
+        cache = RecurringEvent.template_cache
+        maxsize = cache.maxsize
+        try:
+            cache.resize(100)
+            cache.clear()
+            date = RecurringEvent(NOW)
+            self.assertEqual(date.parse('1st and 3rd mon of each month'), 'RRULE:BYDAY=1MO,3MO;INTERVAL=1;FREQ=MONTHLY')
+            self.assertEqual(date.parse('4th and 1st Friday of each month'), 'RRULE:BYDAY=4FR,1FR;INTERVAL=1;FREQ=MONTHLY')
+            self.assertEqual(date.parse('every 5 days until jan 15'), 'RRULE:INTERVAL=5;FREQ=DAILY;UNTIL=20100115')
+            self.assertEqual(date.parse('every 9 days until feb 20'), 'RRULE:INTERVAL=9;FREQ=DAILY;UNTIL=20100220')
+            self.assertEqual(cache.info(), dict(hits=2, misses=2, size=2, maxsize=100))
+            self.assertEqual(date.parse('march 3rd'), datetime.datetime(2010, 3, 3))
+            self.assertEqual(date.parse('june 6th'), datetime.datetime(2010, 6, 6))      # Not templated
+            phrases = [expr[0] for expr in expressions]
+            cache.resize(0)
+            expected = [RecurringEvent(NOW).parse(s) for s in phrases]
+            cache.resize(100)
+            self.assertEqual([RecurringEvent(NOW).parse(s) for s in phrases], expected)
+        finally:
+            cache.resize(maxsize)
+
+    def test_canonical_phrases(self):
+        results = canonical_results()
+        self.assertIn('every other week', results)
+        for preferred_time_range in ((8, 19), (0, 12)):
+            date = RecurringEvent(NOW, preferred_time_range)
+            for phrase in CANONICAL_PHRASES:
+                for s in (phrase, phrase.title() + '.', phrase + ' at 3', phrase + ' at 9:30pm', phrase + ' at 12 am',
+                        phrase + " at 7 o'clock", phrase + ' at 0', phrase + ' at 3 for 2 weeks'):
+                    worker = date._worker()
+                    self.assertEqual(date.parse_result(s), ParseResult.from_event(worker, worker._parse(s)))
+                    self.assertEqual(date.parse(s), RecurringEvent(NOW, preferred_time_range).parse(s))
+        self.assertEqual(RecurringEvent(NOW).parse('Weekdays at 3'), 'RRULE:BYDAY=MO,TU,WE,TH,FR;BYHOUR=15;BYMINUTE=0;INTERVAL=1;FREQ=WEEKLY')
+        self.assertEqual(RecurringEvent(NOW, (0, 12)).parse('Weekdays at 3'), 'RRULE:BYDAY=MO,TU,WE,TH,FR;BYHOUR=3;BYMINUTE=0;INTERVAL=1;FREQ=WEEKLY')
+
+    def test_prefilter(self):
+        date = RecurringEvent(NOW)
+        def full_parse(s):
+            worker = date._worker()
+            return ParseResult.from_event(worker, worker._parse(s))
+        for s in [expr[0] for expr in expressions] + readme_examples():
+            if full_parse(s).value is not None:
+                self.assertTrue(may_be_date(normalize(s)), s)
+        for s in ('a week', 'eom', 'lunch?', 'right now', 'tonight', 'see you tues', 'every monitor', 'at 5'):
+            self.assertTrue(may_be_date(normalize(s)), s)
+            self.assertIsNotNone(date.parse(s), s)
+        self.assertIn('noon', locale_words())
+        consts = parsedatetime.Constants(localeID='en_US', usePyICU=False)
+        self.assertIn('noon', locale_words(consts))
+        consts = weakref.ref(consts)
+        gc.collect()
+        self.assertIsNone(consts())         # the vocabulary doesn't keep its constants alive
+        # Word salad: whatever the prefilter rejects must not parse
+        words = ('ok thanks sounds good i will send the report over when it is done at the end of the '
+                'beginning start starting ending until except for up to and or both other next this that '
+                'from in on a an x times am pm oclock meeting call lunchroom morningstar nightly').split()
+        rnd = random.Random(19)
+        rejected = 0
+        for i in range(2000):
+            s = ' '.join(rnd.choice(words) for j in range(rnd.randint(1, 6)))
+            if not may_be_date(normalize(s)):
+                rejected += 1
+                self.assertIsNone(full_parse(s).value, s)
+                self.assertEqual(date.parse_result(s), full_parse(s))
+                self.assertIsNone(date.parse(s))
+                self.assertFalse(date.is_recurring)
+        self.assertGreater(rejected, 100)
+        class PaydayEvent(RecurringEvent):
+            def parse_singleton(self, s):
+                if s == 'payday':
+                    return NOW.replace(day=15)
+                return super(PaydayEvent, self).parse_singleton(s)
+        payday = PaydayEvent(NOW)
+        self.assertEqual(payday.parse('payday'), NOW.replace(day=15))    # Subclasses aren't prefiltered
+        payday.prefilter = True
+        self.assertIsNone(payday.parse('payday'))
+
+    def test_timeout(self):
+        self.assertFalse(TIMED_OUT)
+        self.assertIs(recurrent.TIMED_OUT, TIMED_OUT)
+        date = RecurringEvent(NOW)
+        # Squashing the except dates into months walks every minute up to 2012
+        rfc = 'RRULE:FREQ=MINUTELY;INTERVAL=1\nEXDATE:20120105T000000,20120210T000000,20120315T000000'
+        start = datetime.datetime.now()
+        self.assertIs(date.format(rfc, timeout=0.05), TIMED_OUT)
+        self.assertIs(rformat(rfc, NOW, timeout=0.05), TIMED_OUT)
+        self.assertLess(datetime.datetime.now() - start, datetime.timedelta(seconds=5))
+        phrase = 'every other tuesday except in june and july'
+        self.assertEqual(date.parse('fridays twice'), 'RRULE:BYDAY=FR;INTERVAL=1;FREQ=WEEKLY;COUNT=2')
+        self.assertIs(date.parse(phrase, timeout=0), TIMED_OUT)
+        self.assertEqual(date.count, 2)         # Left as it was
+        self.assertIs(date.parse_result(phrase, timeout=0), TIMED_OUT)
+        self.assertIs(rparse(phrase, NOW, timeout=0), TIMED_OUT)
+        # An outer deadline still applies to a call with a longer timeout
+        self.assertIs(call_with_timeout(0, date.parse, phrase, 10), TIMED_OUT)
+        # Nothing half-done is left behind
+        for expr in expressions[:200]:
+            self.assertEqual(date.parse(expr[0], timeout=10), RecurringEvent(NOW).parse(expr[0]))
+        self.assertEqual(date.parse(phrase), RecurringEvent(NOW).parse(phrase))
+        self.assertEqual(date.format(date.parse(phrase), timeout=10), 'every other week on Tue except in Jun and Jul')
+
+    def test_input_guards(self):
+        date = RecurringEvent(NOW)
+        long_text = 'x ' * 600 + 'tomorrow'
+        self.assertEqual(date.parse(long_text), TOMORROW.replace(hour=9))
+        date.max_input_length = 1000
+        self.assertIsNone(date.parse(long_text))
+        date.max_input_length = None
+        # Chains of excepts, ordinals and modifiers don't recurse or blow up
+        start = datetime.datetime.now()
+        date.parse('daily ' + 'except on june 1 and ' * 400)
+        date.parse('every ' + '2nd and ' * 400)
+        self.assertIsNone(date.parse('next last ' * 16))
+        self.assertIsNone(date.parse('last 3 ' * 16))
+        self.assertIsNone(date.parse('12 mon ' * 140))
+        # A 'last' doesn't mark an ordinal another 'last' has marked already
+        self.assertEqual(date.parse('next last next last every 2nd day ' * 30), 'RRULE:INTERVAL=2;FREQ=DAILY')
+        self.assertIsNone(date.parse('at the end at the end'))
+        self.assertEqual(date.parse('every third to last friday of the month'), 'RRULE:BYDAY=-3FR;INTERVAL=1;FREQ=MONTHLY')
+        self.assertLess(datetime.datetime.now() - start, datetime.timedelta(seconds=10))
+        self.assertEqual(date.parse('next tuesday'), datetime.datetime(2010, 1, 5, 9, 0))
+
+    def test_trace(self):
+        events = []
+        date = RecurringEvent(NOW)
+        date.trace = events.append
+        self.assertEqual(date.parse('every other friday except on jun 4'),
+                'RRULE:BYDAY=FR;INTERVAL=2;FREQ=WEEKLY\nEXDATE:20100604T000000')
+        stages = [e.stage for e in events]
+        self.assertEqual(stages[:3], ['segment', 'segment', 'tokens'])
+        self.assertIn(stages[-2], ('singleton', 'parsedatetime', 'date_cache'))
+        self.assertEqual(stages[-1], 'exdates')
+        segment_ = events[0].value
+        self.assertEqual((segment_.event, segment_.except_), ('every other friday', 'jun 4'))
+        event = [e for e in events if e.stage == 'event' and e.text == 'every other friday'][0]
+        self.assertEqual(event.value, dict(freq='weekly', interval=2, byday='FR'))
+        del events[:]
+        date.parse('daily')
+        date.parse('ok thanks')
+        self.assertEqual([(e.stage, e.text) for e in events], [('canonical', 'daily'), ('prefilter', 'ok thanks')])
+        self.assertIs(RecurringEvent.trace, None)
+
+    def test_stage_times(self):
+        timer = RecurringEvent.stage_times
+        parse_event = RecurringEvent.__dict__['parse_event']
+        date = RecurringEvent(NOW)
+        date.parse('daily')         # builds the canonical table
+        timer.clear()
+        with timer:
+            self.assertTrue(timer.enabled)
+            rrule = date.parse('every other friday from jan 4 until june except on mar 5')
+            self.assertEqual(date.format(rrule, timeout=10),
+                    'every other week on Fri from Mon Jan 4, 2010 to Tue Jun 1, 2010 except on Fri Mar 5, 2010')
+        self.assertFalse(timer.enabled)
+        self.assertIs(RecurringEvent.__dict__['parse_event'], parse_event)
+        info = timer.info()
+        self.assertEqual(info['format']['calls'], 1)        # not the nested format of the dates
+        for stage in ('normalize', 'segment', 'parse_event', 'apply_clauses', 'parse_date', 'adjust_exdates'):
+            self.assertGreaterEqual(info[stage]['calls'], 1)
+            self.assertGreaterEqual(info[stage]['seconds'], 0)
+        self.assertEqual(info['apply_clauses']['calls'], 1)
+        date.parse('every other friday')
+        self.assertEqual(timer.info(), info)
+        timer.clear()
+        self.assertEqual(timer.info(), {})
+
+    def test_counters(self):
+        counters = RecurringEvent.counters
+        date = RecurringEvent(NOW)
+        date.parse('daily')         # builds the canonical table
+        counters.clear()
+        date.parse('daily')
+        date.parse('ok thanks')
+        date.parse('last friday ' * 20)
+        date.format(date.parse('every day starting next tuesday until feb except on jan 20'))
+        self.assertEqual(date.format('RRULE:FREQ=WEEKLY;BYDAY=XX'), 'RRULE:FREQ=WEEKLY;BYDAY=XX')
+        info = counters.info()
+        counts = info['counts']
+        for name in ('canonical', 'prefilter', 'parsedatetime_skipped', 'rrulestr_adjust_exdates', 'format_errors'):
+            self.assertEqual(counts[name], 1, name)
+        self.assertEqual(counts['rrulestr_starting_needed'], 2)
+        self.assertGreaterEqual(counts['workers'], 3)
+        self.assertEqual(counters['parsedatetime'], counts.get('parsedatetime', 0))
+        self.assertEqual(set(info['caches']), {'date_cache', 'result_cache', 'template_cache', 'tokenizer'})
+        date_cache = info['caches']['date_cache']
+        self.assertEqual(date_cache['hit_rate'], date_cache['hits'] / (date_cache['hits'] + date_cache['misses']))
+        self.assertIsNone(info['caches']['result_cache']['hit_rate'])
+        size = len(RecurringEvent.date_cache)
+        counters.clear()
+        self.assertEqual(counters.info()['counts'], {})
+        self.assertEqual(counters.info()['caches']['date_cache']['hits'], 0)
+        self.assertEqual(len(RecurringEvent.date_cache), size)
+
+    def test_import_time(self):
+        """Importing recurrent compiles no regexes up front and doesn't import parsedatetime or dateutil"""
+        package_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+        # Record what re.compile is given during the import, and keep recurrent's patterns
+        out = subprocess.run([sys.executable, '-c', 'import gc, re, sys\n'
+                'compiled = []\n'
+                'compile = re.compile\n'
+                're.compile = lambda pattern, flags=0: compiled.append(pattern) or compile(pattern, flags)\n'
+                'import recurrent\n'
+                'from recurrent.constants import LazyPattern\n'
+                'ours = set(o.pattern for o in gc.get_objects() if isinstance(o, LazyPattern))\n'
+                'print(sorted(m for m in sys.modules if m.startswith(("parsedatetime", "dateutil"))))\n'
+                'print(sorted(pattern for pattern in compiled if pattern in ours))'],
+                cwd=package_dir, capture_output=True, text=True, check=True).stdout
+        modules, compiled = out.splitlines()
+        self.assertEqual(modules, '[]')
+        self.assertEqual(compiled, '[]')
+        for pattern in (RE_LONG_DATE_START, RE_RRULE, RE_DOW):
+            self.assertEqual(repr(pattern), repr(re.compile(pattern.pattern, pattern.flags)))
+
+    def test_shared_calendar(self):
+        self.assertIs(get_constants(), get_constants())
+        self.assertIs(RecurringEvent(NOW).pdt, RecurringEvent(NOW).pdt)
+        self.assertIs(get_calendar().ptc, get_constants())
+        self.assertIs(get_constants('en_US', usePyICU=False), get_constants('en_US', usePyICU=False))
+        consts = parsedatetime.Constants(localeID='en_US', usePyICU=False)
+        consts.use24 = True
+        self.assertIs(RecurringEvent(NOW, parse_constants=consts).pdt.ptc, consts)
+        # A Calendar assigned to pdt is used by that parser only, and its results aren't shared
+        class FixedCalendar(parsedatetime.Calendar):
+            def parse(self, datetimeString, sourceTime=None, version=None):
+                return datetime.datetime(2011, 2, 3, 4, 5).timetuple(), 3
+        self.assertEqual(RecurringEvent(NOW).parse('next tuesday'), datetime.datetime(2010, 1, 5, 9, 0))
+        r = RecurringEvent(NOW)
+        r.pdt = FixedCalendar()
+        self.assertIsInstance(r.pdt, FixedCalendar)
+        self.assertEqual(r.parse('next tuesday'), datetime.datetime(2011, 2, 3, 4, 5))
+        self.assertIs(RecurringEvent(NOW).pdt, get_calendar())
+        self.assertEqual(RecurringEvent(NOW).parse('next tuesday'), datetime.datetime(2010, 1, 5, 9, 0))
+        # Calendars for constants that are no longer used are dropped
+        calendar = weakref.ref(get_calendar(consts))
+        for _ in range(MAX_CALENDARS):
+            get_calendar(parsedatetime.Constants(localeID='en_US', usePyICU=False))
+        gc.collect()
+        self.assertIsNone(calendar())
+
+def normalize_reference(s):
+    """normalize() as a sequence of regex passes, for checking the single-pass version"""
+    from recurrent.event_parser import RE_LONG_DATE_START
+    s = s.strip().lower()
+    s = re.sub(r',\s*(\d\d\d\d)', r' \1', s)
+    s = RE_LONG_DATE_START.sub(r'\1 \2', s)
+    s = re.sub(r',\s*and', ' and', s)
+    s = re.sub(r',', ' and ', s)
+    s = re.sub(r'[^\w\s\./:-]', '', s)
+    s = re.sub(r'\s+', ' ', s)
+    return s
+
+def segment_reference(s):
+    """segment() as the original cascade of regexes, for checking the single-pass version"""
+    from recurrent.event_parser import (Clauses, RE_EXCEPT, RE_START_EVENT, RE_EVENT_START, RE_FROM_TO,
+            RE_OTHER_END, RE_COUNT, RE_COUNT_UNTIL1, RE_COUNT_UNTIL)
+    from recurrent.constants import get_number
+    clauses = Clauses(None)
+    def extract_ending(s):
+        m = RE_OTHER_END.search(s)
+        if m:
+            clauses.end = m.group('ending').strip()
+            return m.group('other')
+        m = RE_COUNT.search(s)
+        if m:
+            clauses.count = 2 if m.group('twice') else get_number(m.group('count'))
+            return m.group('event')
+        m = RE_COUNT_UNTIL1.search(s)
+        if m:
+            clauses.period = (1, m.group('unit') + 's')
+            return m.group('event')
+        m = RE_COUNT_UNTIL.search(s)
+        if m:
+            clauses.period = (get_number(m.group('count')), m.group('unit'))
+            return m.group('event')
+        return s
+    m = RE_EXCEPT.match(s)
+    if m:
+        s = m.group('event')
+        clauses.except_ = m.group('except').strip()
+    m = RE_START_EVENT.search(s)
+    if m:
+        clauses.start = m.group('starting').strip()
+        clauses.event = extract_ending(m.group('event')).strip()
+        return clauses
+    m = RE_EVENT_START.search(s)
+    if m:
+        clauses.event = m.group('event').strip()
+        clauses.start = extract_ending(m.group('starting')).strip()
+        return clauses
+    m = RE_FROM_TO.search(s)
+    if m:
+        clauses.event = m.group('event').strip()
+        clauses.start = m.group('starting').strip()
+        clauses.end = m.group('ending').strip()
+        return clauses
+    clauses.event = extract_ending(s).strip()
+    return clauses
+
+def readme_examples():
+    readme = os.path.join(os.path.dirname(__file__), '..', '..', 'README.md')
+    if not os.path.exists(readme):
+        return []       # pragma nocover
+    with open(readme) as f:
+        return [line[2:].strip() for line in f if line.startswith('* ')]
+
+def classifier_corpus():
+    """Every whitespace-separated word of the normalized test expressions"""
+    for expr in expressions:
+        for word in normalize(expr[0]).split():
+            yield word
+
 def tst_expression(string, expected, de):
     def test_(self):
         date = RecurringEvent(NOW)